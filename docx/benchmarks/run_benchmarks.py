@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# 합성 템플릿/입력으로 docx_to_docx.py, pdf_to_docs.py 와 같은 파이프라인을 끝까지 돌려 시간 측정
+# 모델 대신 StubEncoder 를 쓰므로 오프라인(CI)에서도 실행됨
+#
+#   python benchmarks/run_benchmarks.py --output bench.json
+#   python benchmarks/run_benchmarks.py --quick --baseline bench.json   (느려지면 종료 코드 1)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+import metrics
+from docx_to_docx import extract_docx_text
+from template_filler import TemplateFiller, run_pipeline, save_document
+
+from stub_encoder import StubEncoder
+from synthetic import make_inputs, make_template
+
+BASE = {'paragraphs': 20, 'rows': 10, 'cols': 4, 'files': 5}
+# 한 번에 한 축만 바꿔 가며 측정 (문서 크기, 표 크기, 폴더 크기)
+AXES = {
+    'paragraphs': [10, 50, 200],
+    'rows': [5, 20, 80],
+    'files': [1, 10, 50],
+}
+QUICK_AXES = {
+    'paragraphs': [10, 50],
+    'rows': [5, 20],
+    'files': [1, 10],
+}
+
+
+def scenarios(axes):
+    yield 'base', dict(BASE)
+    for axis, values in axes.items():
+        for value in values:
+            if value != BASE[axis]:
+                yield f"{axis}={value}", dict(BASE, **{axis: value})
+
+
+def extractors():
+    found = {'docx': extract_docx_text}
+    try:
+        from pdf_to_docs import extract_pdf_text
+        found['pdf'] = extract_pdf_text
+    except ImportError:
+        print("PyMuPDF(fitz) 가 없어서 PDF 벤치마크는 건너뜀")
+    return found
+
+
+def run_scenario(work_dir, params, kind, extract, repeat):
+    os.makedirs(work_dir, exist_ok=True)
+    template_path = os.path.join(work_dir, 'template.docx')
+    if not os.path.exists(template_path):
+        make_template(template_path, params['paragraphs'], params['rows'], params['cols'])
+    paths = make_inputs(os.path.join(work_dir, kind), kind, params['files'],
+                        params['paragraphs'], params['rows'], params['cols'])
+    out_path = os.path.join(work_dir, f'out_{kind}.docx')
+
+    # 캐시가 빈 상태에서 템플릿 파싱 + 키워드 인코딩
+    metrics.snapshot(reset=True)
+    start = time.perf_counter()
+    filler = TemplateFiller(
+        template_path, model=StubEncoder(), model_name='stub',
+        cache_path=os.path.join(work_dir, 'cache', f'{kind}.sqlite3'),
+        template_cache_dir=os.path.join(work_dir, 'cache', f'templates_{kind}'),
+    )
+    setup_seconds = time.perf_counter() - start
+    setup_stages = metrics.snapshot(reset=True)['stages']
+
+    walls = []
+    for _ in range(repeat):
+        doc = Document()
+        start = time.perf_counter()
+        run_pipeline(filler, doc, extract, paths)
+        save_document(doc, out_path)
+        walls.append(time.perf_counter() - start)
+    data = metrics.report()
+    filler.close()
+
+    return {
+        'kind': kind,
+        'params': params,
+        'setup_seconds': setup_seconds,
+        'setup_stages': setup_stages,
+        'wall_median': statistics.median(walls),
+        'wall_min': min(walls),
+        'per_file': statistics.median(walls) / params['files'],
+        # 반복 평균 단계별 시간
+        'stages': {stage: entry['seconds'] / repeat for stage, entry in data['stages'].items()},
+        'counters': data['counters'],
+        'derived': data['derived'],
+    }
+
+
+def compare(results, baseline, tolerance):
+    # baseline 보다 wall_median 이 tolerance 비율 이상 느려진 시나리오 목록
+    old = {(r['name'], r['kind']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        prev = old.get((r['name'], r['kind']))
+        if prev and r['wall_median'] > prev['wall_median'] * (1 + tolerance):
+            regressions.append((r['name'], r['kind'], prev['wall_median'], r['wall_median']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 양식으로 변환 파이프라인 벤치마크")
+    parser.add_argument('--quick', action='store_true', help="축마다 값 두 개만 측정")
+    parser.add_argument('--repeat', type=int, default=3, help="시나리오마다 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--kinds', default='docx,pdf', help="측정할 입력 형식")
+    parser.add_argument('--output', default=None, help="결과 JSON 경로")
+    parser.add_argument('--baseline', default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="허용하는 느려짐 비율")
+    parser.add_argument('--work-dir', default=None, help="합성 파일을 만들 폴더 (기본: 임시 폴더)")
+    args = parser.parse_args()
+
+    available = extractors()
+    kinds = [kind for kind in args.kinds.split(',') if kind in available]
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as root:
+        for name, params in scenarios(QUICK_AXES if args.quick else AXES):
+            work_dir = os.path.join(root, name.replace('=', '_'))
+            for kind in kinds:
+                result = run_scenario(work_dir, params, kind, available[kind], args.repeat)
+                result['name'] = name
+                results.append(result)
+                stages = ', '.join(f"{stage} {seconds * 1000:.1f}ms" for stage, seconds in
+                                   sorted(result['stages'].items(), key=lambda item: -item[1])[:4])
+                print(f"{name:16} {kind:5} {result['wall_median'] * 1000:9.1f}ms "
+                      f"({result['per_file'] * 1000:.1f}ms/file)  {stages}")
+
+    report = {'python': sys.version.split()[0], 'repeat': args.repeat, 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, kind, old, new in regressions:
+            print(f"느려짐: {name} {kind} {old * 1000:.1f}ms -> {new * 1000:.1f}ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import hashlib
+
+import numpy as np
+
+# 모델을 내려받지 않고 벤치마크를 돌리기 위한 SentenceTransformer 대용 인코더
+# 글자 1/2-gram 을 해시해서 고정 차원 벡터로 만듦 (같은 글자가 많으면 유사도가 높음)
+
+STUB_DIM = 384
+
+
+def _bucket(gram):
+    return int.from_bytes(hashlib.md5(gram.encode('utf-8')).digest()[:4], 'little')
+
+
+class StubEncoder:
+    def __init__(self, dim=STUB_DIM):
+        self.dim = dim
+        self._buckets = {}
+
+    def _vector(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        grams = list(text) + [text[i:i + 2] for i in range(len(text) - 1)]
+        for gram in grams:
+            bucket = self._buckets.get(gram)
+            if bucket is None:
+                bucket = self._buckets[gram] = _bucket(gram) % self.dim
+            vec[bucket] += 1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._vector(text) for text in texts])
@@ -0,0 +1,114 @@
+import os
+import random
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt
+
+# 보고서.docx 와 같은 모양의 합성 템플릿/입력 생성
+# 템플릿: 제목 + "항목 : " 문단 N 개 + 항목/값 칸이 번갈아 있는 표 (gridSpan, vMerge 포함)
+# 입력: 템플릿 항목에 대한 "항목 : 값" 줄 (DOCX 문단 + 표, PDF 텍스트)
+
+LABELS = ['성명', '나이', '주소', '연락처', '이메일', '소속', '직위', '경력', '학력', '자격', '비고', '작성일']
+VALUES = ['홍길동', '서울시 종로구', '010-1234-5678', 'a@b.c', '개발팀', '과장', '5년', '학사', '정보처리기사', '없음']
+
+
+def label(prefix, i):
+    return f"{LABELS[i % len(LABELS)]}{prefix}{i}"
+
+
+def paragraph_labels(paragraphs):
+    return [label('문', i) for i in range(paragraphs)]
+
+
+def table_labels(rows, cols):
+    # 짝수 칸은 항목, 홀수 칸은 값. 세 번째 행마다 첫 칸은 위 행과 세로 병합되므로 항목이 없음
+    labels = []
+    for r in range(rows):
+        for c in range(0, cols - 1, 2):
+            if c == 0 and r % 3 == 2:
+                continue
+            labels.append(label('표', r * cols + c))
+    return labels
+
+
+def make_template(path, paragraphs=20, rows=10, cols=4):
+    doc = Document()
+    title = doc.add_paragraph()
+    run = title.add_run("합성 보고서")
+    run.bold = True
+    run.font.size = Pt(16)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    for text in paragraph_labels(paragraphs):
+        doc.add_paragraph(f"{text} : ")
+
+    table = doc.add_table(rows=rows, cols=cols)
+    table.style = doc.styles['Table Grid']
+    for r in range(rows):
+        for c in range(0, cols - 1, 2):
+            if c == 0 and r % 3 == 2:
+                continue
+            table.cell(r, c).paragraphs[0].add_run(label('표', r * cols + c)).font.name = '맑은 고딕'
+    for r in range(rows):
+        if r % 3 == 2:
+            # 첫 칸 세로 병합 (vMerge)
+            table.cell(r - 1, 0).merge(table.cell(r, 0))
+        elif r % 4 == 3 and cols >= 4:
+            # 마지막 값 칸 가로 병합 (gridSpan)
+            table.cell(r, cols - 2).merge(table.cell(r, cols - 1))
+    doc.add_paragraph("기타 사항")
+    doc.save(path)
+
+
+def input_lines(paragraphs, rows, cols, seed):
+    rng = random.Random(seed)
+    lines = [f"{text} : {rng.choice(VALUES)}" for text in paragraph_labels(paragraphs)]
+    lines += [f"{text} : {rng.choice(VALUES)}" for text in table_labels(rows, cols)]
+    # 템플릿에 없는 잡음 줄
+    lines += [f"참고 {i} {rng.choice(VALUES)}" for i in range(max(1, len(lines) // 10))]
+    rng.shuffle(lines)
+    return lines
+
+
+def write_docx_input(path, lines):
+    doc = Document()
+    half = len(lines) // 2
+    for line in lines[:half]:
+        doc.add_paragraph(line)
+    rest = lines[half:]
+    if rest:
+        table = doc.add_table(rows=(len(rest) + 1) // 2, cols=2)
+        for i, line in enumerate(rest):
+            table.cell(i // 2, i % 2).text = line
+    doc.save(path)
+
+
+def write_pdf_input(path, lines, lines_per_page=40):
+    import fitz
+    pdf = fitz.open()
+    font = fitz.Font('cjk')
+    for start in range(0, max(len(lines), 1), lines_per_page):
+        page = pdf.new_page()
+        writer = fitz.TextWriter(page.rect)
+        y = 60
+        for line in lines[start:start + lines_per_page]:
+            writer.append((60, y), line, font=font, fontsize=10)
+            y += 18
+        writer.write_text(page)
+    pdf.save(path)
+    pdf.close()
+
+
+def make_inputs(directory, kind, files, paragraphs=20, rows=10, cols=4):
+    # kind: 'docx' 또는 'pdf', 파일마다 값은 다르지만 seed 로 항상 같은 내용
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for n in range(files):
+        lines = input_lines(paragraphs, rows, cols, seed=n)
+        path = os.path.join(directory, f"{n:04d}.{kind}")
+        if kind == 'pdf':
+            write_pdf_input(path, lines)
+        else:
+            write_docx_input(path, lines)
+        paths.append(path)
+    return paths
@@ -0,0 +1,113 @@
+import posixpath
+import zipfile
+
+from lxml import etree
+
+# DOCX 입력을 python-docx 객체 없이 읽기 (docx_to_docx.py --docx-mode stream)
+# zip 안의 본문 XML 을 iterparse 로 한 번 훑으면서 본문 바로 아래의 문단/표가 끝날 때마다 줄을 만들고
+# 그 요소와 앞의 형제들을 지움 -> 메모리는 블록 하나 분량, 순서는 문서 순서 그대로
+# 표는 행마다 실제 셀(w:tc)만 " | " 로 이음 (row.cells 와 달리 가로/세로 병합 셀이 여러 번 나오지 않음)
+# 글자는 python-docx 의 Paragraph.text 와 같은 규칙 (w:tab -> \t, 줄바꿈 w:br -> \n, 하이퍼링크 글자 포함)
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+DEFAULT_DOCUMENT_PART = 'word/document.xml'
+
+
+def w(tag):
+    return f'{{{W_NS}}}{tag}'
+
+
+W_BODY, W_P, W_TBL, W_TR, W_TC = w('body'), w('p'), w('tbl'), w('tr'), w('tc')
+W_R, W_HYPERLINK, W_T, W_BR = w('r'), w('hyperlink'), w('t'), w('br')
+W_BR_TYPE = w('type')
+# w:t, w:br 말고 글자로 바뀌는 run 안 요소
+RUN_CHARS = {w('tab'): '\t', w('ptab'): '\t', w('cr'): '\n', w('noBreakHyphen'): '-'}
+
+
+def document_part_name(zf):
+    # _rels/.rels 의 officeDocument 관계로 본문 파트 이름을 찾음 (없으면 word/document.xml)
+    try:
+        rels = etree.fromstring(zf.read('_rels/.rels'))
+    except (KeyError, etree.XMLSyntaxError):
+        return DEFAULT_DOCUMENT_PART
+    for rel in rels.iter(f'{{{PACKAGE_REL_NS}}}Relationship'):
+        if rel.get('Type') == OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get('Target').lstrip('/'))
+    return DEFAULT_DOCUMENT_PART
+
+
+def run_text(r):
+    parts = []
+    for e in r:
+        if e.tag == W_T:
+            parts.append(e.text or '')
+        elif e.tag == W_BR:
+            if e.get(W_BR_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        else:
+            parts.append(RUN_CHARS.get(e.tag, ''))
+    return ''.join(parts)
+
+
+def paragraph_text(p):
+    parts = []
+    for child in p:
+        if child.tag == W_R:
+            parts.append(run_text(child))
+        elif child.tag == W_HYPERLINK:
+            parts.extend(run_text(r) for r in child.iterchildren(W_R))
+    return ''.join(parts)
+
+
+def cell_text(tc):
+    # cell.text 처럼 셀 바로 아래 문단을 줄바꿈으로 이음 (셀 안의 표는 제외)
+    return '\n'.join(paragraph_text(p) for p in tc.iterchildren(W_P))
+
+
+def row_text(tr):
+    texts = [text for text in (cell_text(tc).strip() for tc in tr.iterchildren(W_TC)) if text]
+    return " | ".join(texts)
+
+
+def iter_body_blocks(source):
+    # 본문 바로 아래의 w:p / w:tbl 요소를 문서 순서로 넘기고, 다 쓰면 지움
+    # source 는 파일 경로 또는 file-like 객체
+    with zipfile.ZipFile(source) as zf:
+        with zf.open(document_part_name(zf)) as f:
+            for _, elem in etree.iterparse(f, events=('end',), tag=(W_P, W_TBL)):
+                parent = elem.getparent()
+                # 표 안의 문단은 표가 끝날 때 같이 처리
+                if parent is None or parent.tag != W_BODY:
+                    continue
+                yield elem
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+def iter_docx_records(source):
+    # (종류, 블록 번호, 행 번호, 글자) 를 문서 순서로. 종류는 'paragraph' / 'table', 블록 번호는 본문 안의 순서,
+    # 행 번호는 표의 몇 번째 행인지 (문단은 None). 빈 문단/행은 건너뜀
+    for block_index, elem in enumerate(iter_body_blocks(source)):
+        if elem.tag == W_P:
+            text = paragraph_text(elem).strip()
+            if text:
+                yield 'paragraph', block_index, None, text
+        else:
+            for row_index, tr in enumerate(elem.iterchildren(W_TR)):
+                text = row_text(tr)
+                if text:
+                    yield 'table', block_index, row_index, text
+
+
+def iter_docx_lines(source):
+    # 줄 목록만 필요한 곳(추출/매핑)을 위한 iter_docx_records 의 글자만
+    records = iter_docx_records(source)
+    try:
+        for _, _, _, text in records:
+            yield text
+    finally:
+        # 중간에 멈추면(--stop-early) zip 파일도 바로 닫음
+        records.close()
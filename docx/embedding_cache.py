@@ -0,0 +1,110 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+import numpy as np
+
+# 템플릿 키워드, "성명"/"나이"/"주소" 같은 반복 항목명은 실행마다 같은 문자열이 들어오므로
+# (모델 이름 + 정규화된 텍스트) 해시를 키로 임베딩을 SQLite 에 저장해 두고 재사용한다.
+
+DEFAULT_MAX_ENTRIES = 200000
+# SQLite 의 IN (...) 파라미터 개수 제한 때문에 나눠서 조회
+LOOKUP_CHUNK = 500
+
+
+def normalize_text(text):
+    text = unicodedata.normalize('NFC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_key(model_name, text):
+    return hashlib.sha1(f"{model_name}\x00{text}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path, model_name, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 여러 워커 프로세스가 같은 캐시 파일을 같이 쓰므로 WAL 모드 + 넉넉한 잠금 대기
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vec BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings (last_used)")
+        self.conn.commit()
+
+    def _lookup(self, keys):
+        found = {}
+        for i in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[i:i + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, dim, vec FROM embeddings WHERE key IN ({placeholders})", chunk
+            )
+            for key, dim, vec in rows:
+                found[key] = np.frombuffer(vec, dtype=np.float32, count=dim)
+        return found
+
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            # 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE key IN"
+                " (SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def encode(self, model, texts, batch_size=256):
+        # texts 순서대로 (len(texts), dim) float32 배열 반환, 캐시에 없는 것만 모델로 인코딩
+        normalized = [normalize_text(text) for text in texts]
+        unique_texts = list(dict.fromkeys(normalized))
+        keys = {text: make_key(self.model_name, text) for text in unique_texts}
+
+        found = self._lookup(list(keys.values()))
+        missing = [text for text in unique_texts if keys[text] not in found]
+        self.hits += len(unique_texts) - len(missing)
+        self.misses += len(missing)
+
+        now = time.time()
+        if missing:
+            new_emb = model.encode(missing, batch_size=batch_size, convert_to_numpy=True)
+            new_emb = np.asarray(new_emb, dtype=np.float32)
+            rows = []
+            for text, emb in zip(missing, new_emb):
+                found[keys[text]] = emb
+                rows.append((keys[text], self.model_name, emb.shape[0], emb.tobytes(), now))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vec, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        missing_set = set(missing)
+        hit_keys = [(now, keys[text]) for text in unique_texts if text not in missing_set]
+        if hit_keys:
+            self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", hit_keys)
+        if missing:
+            self._evict()
+        self.conn.commit()
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[keys[text]] for text in normalized])
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,125 @@
+import math
+import os
+import zlib
+from collections import Counter
+
+import numpy as np
+
+import metrics
+
+# 키워드 매핑에 쓰는 인코더 (--encoder 로 실행마다 선택)
+#   sbert : SentenceTransformer (torch). 처음 encode 할 때 불러옴
+#   onnx  : 같은 모델을 ONNX 로 내보낸 것 (onnxruntime + tokenizers, torch 없음)
+#           optimum-cli export onnx --model jhgan/ko-sbert-nli docx/models/ko-sbert-nli-onnx
+#           model_quantized.onnx 가 있으면 그것을 씀
+#   tfidf : 글자 n-gram TF-IDF. 템플릿 키워드로 IDF 를 만들고 바로 시작함 (모델 없음)
+# 모두 SentenceTransformer 와 같은 encode(texts, batch_size=..., convert_to_numpy=True) 를 제공.
+# cache_name 은 임베딩 캐시/템플릿 캐시에 쓰는 이름이고, None 이면 캐시하지 않음
+
+ENCODER_BACKENDS = ('sbert', 'onnx', 'tfidf')
+ONNX_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'ko-sbert-nli-onnx')
+# 백엔드마다 유사도 분포가 달라서 매핑 기준값도 따로 둠
+DEFAULT_THRESHOLDS = {'sbert': 0.7, 'onnx': 0.7, 'tfidf': 0.5}
+
+
+def load_model(model_name):
+    # torch import 가 무거워서 실제로 모델이 필요할 때만 불러옴
+    from sentence_transformers import SentenceTransformer
+    with metrics.timer('model_load'):
+        return SentenceTransformer(model_name)
+
+
+class SbertEncoder:
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.cache_name = model_name
+        self.model = None
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        if self.model is None:
+            self.model = load_model(self.model_name)
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=convert_to_numpy, **kwargs)
+
+
+class OnnxEncoder:
+    def __init__(self, model_dir=ONNX_MODEL_DIR, max_length=128):
+        self.model_dir = model_dir
+        self.max_length = max_length
+        self.session = None
+        self.tokenizer = None
+        quantized = os.path.exists(os.path.join(model_dir, 'model_quantized.onnx'))
+        self.model_file = 'model_quantized.onnx' if quantized else 'model.onnx'
+        self.cache_name = f"onnx:{os.path.basename(os.path.normpath(model_dir))}:{self.model_file}"
+
+    def _load(self):
+        import onnxruntime
+        from tokenizers import Tokenizer
+        with metrics.timer('model_load'):
+            self.session = onnxruntime.InferenceSession(
+                os.path.join(self.model_dir, self.model_file), providers=['CPUExecutionProvider']
+            )
+            self.input_names = {i.name for i in self.session.get_inputs()}
+            self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, 'tokenizer.json'))
+            self.tokenizer.enable_truncation(max_length=self.max_length)
+            self.tokenizer.enable_padding()
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        if self.session is None:
+            self._load()
+        out = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            feeds = {'input_ids': ids, 'attention_mask': mask}
+            if 'token_type_ids' in self.input_names:
+                feeds['token_type_ids'] = np.array([e.type_ids for e in encoded], dtype=np.int64)
+            token_emb = self.session.run(None, feeds)[0]
+            # SBERT 와 같은 mean pooling
+            weights = mask[:, :, None].astype(np.float32)
+            out.append((token_emb * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None))
+        if not out:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(out).astype(np.float32)
+
+
+class TfidfEncoder:
+    # 글자 n-gram 을 crc32 로 해시한 고정 차원 TF-IDF 벡터 (한글 항목명은 글자 단위 겹침이 잘 맞음)
+    cache_name = None
+
+    def __init__(self, ngram_range=(1, 3), dim=4096):
+        self.ngram_range = ngram_range
+        self.dim = dim
+        self.idf = {}
+        self.default_idf = 1.0
+
+    def _grams(self, text):
+        text = text.replace(' ', '')
+        low, high = self.ngram_range
+        return [text[i:i + n] for n in range(low, high + 1) for i in range(len(text) - n + 1)]
+
+    def fit(self, texts):
+        # 템플릿 키워드 기준 IDF. 키워드에 없는 gram 은 가장 드문 것과 같은 가중치
+        df = Counter(gram for text in texts for gram in set(self._grams(text)))
+        n = len(texts)
+        self.idf = {gram: math.log((1 + n) / (1 + count)) + 1 for gram, count in df.items()}
+        self.default_idf = math.log(1 + n) + 1
+        return self
+
+    def encode(self, texts, batch_size=None, convert_to_numpy=True, **kwargs):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for gram, tf in Counter(self._grams(text)).items():
+                col = zlib.crc32(gram.encode('utf-8')) % self.dim
+                out[row, col] += tf * self.idf.get(gram, self.default_idf)
+        return out
+
+
+def make_encoder(backend, model_name, onnx_path=None):
+    if backend == 'sbert':
+        return SbertEncoder(model_name)
+    if backend == 'onnx':
+        return OnnxEncoder(onnx_path or ONNX_MODEL_DIR)
+    if backend == 'tfidf':
+        return TfidfEncoder()
+    raise ValueError(f"알 수 없는 인코더: {backend}")
@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+
+# 조각 임베딩 -> 가장 비슷한 키워드 top-k 검색
+#   exact : 정규화한 키워드 행렬과 행렬곱 (키워드가 적을 때, 결과가 cos_sim + argmax 와 같음)
+#   ivf   : 키워드를 k-means 로 묶어 두고 가까운 묶음 n_probe 개만 비교 (수만 개 이상일 때)
+# IVF 는 만드는 데 시간이 걸리므로 템플릿 캐시 옆에 .npz 로 저장해 두고 다시 읽음
+
+KEYWORD_INDEX_BACKENDS = ('auto', 'exact', 'ivf')
+# auto 일 때 이 개수 이상이면 ivf
+IVF_MIN_KEYWORDS = 4096
+IVF_N_PROBE = 8
+IVF_TRAIN_ITERATIONS = 10
+# 한 번에 만드는 점수 행렬의 최대 원소 수 (질의 수 x 키워드 수, float32 기준 64MB)
+SCORE_BLOCK_ELEMENTS = 1 << 24
+
+
+def normalize_rows(emb):
+    emb = np.asarray(emb, dtype=np.float32)
+    return emb / np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+
+
+def top_k(scores, k):
+    # 행마다 점수가 큰 순서로 k 개 (같은 점수면 앞 인덱스가 먼저, argmax 와 같은 규칙)
+    if k == 1:
+        ids = scores.argmax(axis=1)[:, None]
+    else:
+        k = min(k, scores.shape[1])
+        ids = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(scores, ids, axis=1)
+        ids = np.take_along_axis(ids, np.lexsort((ids, -top), axis=1), axis=1)
+    return np.take_along_axis(scores, ids, axis=1), ids
+
+
+class ExactIndex:
+    backend = 'exact'
+
+    def __init__(self, emb):
+        self.emb = normalize_rows(emb)
+
+    def __len__(self):
+        return len(self.emb)
+
+    def search(self, queries, k=1):
+        # (scores, ids): 둘 다 (질의 수, k)
+        queries = normalize_rows(queries)
+        chunk = max(1, SCORE_BLOCK_ELEMENTS // max(1, len(self.emb)))
+        scores_out, ids_out = [], []
+        for start in range(0, len(queries), chunk):
+            scores, ids = top_k(queries[start:start + chunk] @ self.emb.T, k)
+            scores_out.append(scores)
+            ids_out.append(ids)
+        if not scores_out:
+            return np.zeros((0, k), dtype=np.float32), np.zeros((0, k), dtype=np.int64)
+        return np.concatenate(scores_out), np.concatenate(ids_out)
+
+
+class IvfIndex:
+    backend = 'ivf'
+
+    def __init__(self, emb, centroids, list_ids, list_offsets, n_probe=IVF_N_PROBE):
+        self.emb = emb                    # 정규화된 키워드 임베딩
+        self.centroids = centroids        # (n_lists, dim)
+        self.list_ids = list_ids          # 묶음 순서로 정렬한 키워드 인덱스
+        self.list_offsets = list_offsets  # 묶음 i 의 키워드 = list_ids[offsets[i]:offsets[i + 1]]
+        self.n_probe = n_probe
+
+    def __len__(self):
+        return len(self.emb)
+
+    @classmethod
+    def build(cls, emb, n_lists=None, n_probe=IVF_N_PROBE, seed=0):
+        emb = normalize_rows(emb)
+        n = len(emb)
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        # 학습은 표본으로 (묶음당 최대 64개), 배정은 전체로
+        sample = emb[rng.choice(n, min(n, n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(IVF_TRAIN_ITERATIONS):
+            assign = (sample @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=n_lists)
+            empty = counts == 0
+            # 빈 묶음은 임의의 표본으로 다시 시작
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = normalize_rows(sums)
+        chunk = max(1, SCORE_BLOCK_ELEMENTS // n_lists)
+        assign = np.concatenate([
+            (emb[start:start + chunk] @ centroids.T).argmax(axis=1)
+            for start in range(0, n, chunk)
+        ])
+        list_ids = np.argsort(assign, kind='stable')
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))])
+        return cls(emb, centroids, list_ids, list_offsets, n_probe)
+
+    def search(self, queries, k=1):
+        queries = normalize_rows(queries)
+        n_probe = min(self.n_probe, len(self.centroids))
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        # 질의마다 가까운 묶음 n_probe 개 -> 묶음별로 그 묶음을 보는 질의만 모아 한 번에 계산
+        probes = top_k(queries @ self.centroids.T, n_probe)[1]
+        for list_no in np.unique(probes):
+            members = self.list_ids[self.list_offsets[list_no]:self.list_offsets[list_no + 1]]
+            if not len(members):
+                continue
+            rows = np.nonzero((probes == list_no).any(axis=1))[0]
+            scores = queries[rows] @ self.emb[members].T
+            merged_scores = np.concatenate([best_scores[rows], scores], axis=1)
+            merged_ids = np.concatenate([best_ids[rows], np.broadcast_to(members, scores.shape)], axis=1)
+            # 점수가 큰 순서, 같은 점수면 키워드 인덱스가 작은 것 (exact 와 같은 규칙)
+            order = np.lexsort((merged_ids, -merged_scores), axis=1)[:, :k]
+            best_scores[rows] = np.take_along_axis(merged_scores, order, axis=1)
+            best_ids[rows] = np.take_along_axis(merged_ids, order, axis=1)
+        return best_scores, best_ids
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, emb=self.emb, centroids=self.centroids, list_ids=self.list_ids,
+                 list_offsets=self.list_offsets)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, n_probe=IVF_N_PROBE):
+        try:
+            with np.load(path) as data:
+                return cls(data['emb'], data['centroids'], data['list_ids'], data['list_offsets'], n_probe)
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def build_keyword_index(emb, backend='auto', path=None, n_probe=IVF_N_PROBE):
+    # path 가 있으면 ivf 색인을 거기서 읽거나, 새로 만들어 저장
+    if backend == 'auto':
+        backend = 'ivf' if len(emb) >= IVF_MIN_KEYWORDS else 'exact'
+    if backend == 'exact':
+        return ExactIndex(emb)
+    if backend != 'ivf':
+        raise ValueError(f"알 수 없는 키워드 색인: {backend}")
+    index = IvfIndex.load(path, n_probe) if path and os.path.exists(path) else None
+    if index is None or len(index) != len(emb):
+        index = IvfIndex.build(emb, n_probe=n_probe)
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            index.save(path)
+    return index
@@ -0,0 +1,113 @@
+# 입력 줄 목록에 대한 문자 2-gram 역색인
+# restore 단계에서 "key 를 포함하는 가장 앞의 줄" 을 찾을 때 모든 줄을 매번 훑지 않고,
+# key 의 2-gram 중 가장 드문 것의 줄 목록만 확인한다. 사용한(consume) 줄은 삭제 표시만 함.
+
+from bisect import bisect_left
+
+
+class LineMatcher:
+    # window 를 주면 마지막으로 찾은 줄 번호부터 window 줄(줄 번호 기준) 안에서 먼저 찾고, 없을 때만 처음부터 찾음
+    # (입력이 문서 순서일 때 같은 항목명이 여러 번 나오면 템플릿 순서에 가까운 줄을 고름)
+    def __init__(self, lines, window=None):
+        self.lines = list(lines)
+        self.window = window
+        self.position = 0
+        self.alive = [True] * len(self.lines)
+        self.postings = {}
+        for i, line in enumerate(self.lines):
+            for gram in {line[j:j + 2] for j in range(len(line) - 1)}:
+                self.postings.setdefault(gram, []).append(i)
+        # key 별로 마지막으로 찾은 후보 위치. 줄은 지워지기만 하므로 다음 검색은 여기서부터 시작해도 됨
+        self._cursor = {}
+
+    def _candidates(self, key):
+        if len(key) < 2:
+            return range(len(self.lines))
+        best = None
+        for j in range(len(key) - 1):
+            posting = self.postings.get(key[j:j + 2])
+            if posting is None:
+                return ()
+            if best is None or len(posting) < len(best):
+                best = posting
+        return best
+
+    def _find_index(self, key):
+        candidates = self._candidates(key)
+        for pos in range(self._cursor.get(key, 0), len(candidates)):
+            i = candidates[pos]
+            if self.alive[i] and key in self.lines[i]:
+                self._cursor[key] = pos
+                return i
+        self._cursor[key] = len(candidates)
+        return None
+
+    def _find_in_window(self, key):
+        # position 부터 window 줄 안에서 key 를 포함하는 첫 줄 (후보 목록은 줄 번호 순서라 bisect 로 시작점을 찾음)
+        end = self.position + self.window
+        candidates = self._candidates(key)
+        start = bisect_left(candidates, self.position)
+        for pos in range(start, len(candidates)):
+            i = candidates[pos]
+            if i >= end:
+                break
+            if self.alive[i] and key in self.lines[i]:
+                return i
+        return None
+
+    def _locate(self, key):
+        i = self._find_in_window(key) if self.window else None
+        if i is None:
+            i = self._find_index(key)
+        if i is not None:
+            self.position = i
+        return i
+
+    def find(self, key):
+        # key 를 포함하는 가장 앞의 (아직 쓰지 않은) 줄, 없으면 None
+        # window 가 있으면 현재 위치 근처를 먼저 봄
+        if not key:
+            return None
+        i = self._locate(key)
+        return None if i is None else self.lines[i]
+
+    def consume(self, key):
+        # find 와 같지만 찾은 줄을 이후 검색에서 제외
+        if not key:
+            return None
+        i = self._locate(key)
+        if i is None:
+            return None
+        self.alive[i] = False
+        return self.lines[i]
+
+    def remaining(self):
+        return [line for line, alive in zip(self.lines, self.alive) if alive]
+
+
+class KeyTracker:
+    # 입력 줄을 읽는 대로 넣어 보고, 템플릿 키마다 그 키를 쓸 수 있는 줄이 필요한 수만큼 나왔으면 True
+    # (--stop-early: True 가 되면 남은 입력은 읽지 않음)
+    # 표 셀 키(consumed)는 줄을 가져가 버리므로, 표 셀 키가 둘 이상 들어 있는 줄은 세지 않고
+    # 하나 들어 있으면 그 키에만 셈. 표 셀 키가 없는 줄만 문단 키에 셈
+    # 근사임: map_line 은 모델 없이 정해지는 매핑(정확/정규화 일치)만 적용한 줄을 돌려주는데, restore 는
+    # 임베딩 매핑까지 거친 줄로 매칭함. 임베딩 매핑이 센 키를 지우거나 표 셀 키를 하나 더 만들면
+    # 읽지 않은 뒤쪽 줄이 결과를 바꿀 수 있음. 임베딩으로만 매핑되는 키는 세지 못하므로 그런 키가 있으면 끝까지 읽음
+    def __init__(self, needed, consumed, map_line):
+        self.keys = list(needed)
+        self.needed = dict(needed)
+        self.consumed = consumed
+        self.map_line = map_line
+
+    def __call__(self, line):
+        if self.needed:
+            line = self.map_line(line)
+            hits = [key for key in self.keys if key in line]
+            cell_hits = [key for key in hits if key in self.consumed]
+            if len(cell_hits) <= 1:
+                for key in cell_hits or hits:
+                    if key in self.needed:
+                        self.needed[key] -= 1
+                        if not self.needed[key]:
+                            del self.needed[key]
+        return not self.needed
@@ -0,0 +1,41 @@
+import atexit
+import json
+import os
+import time
+
+# 매칭 결정(키 -> 찾은 줄 -> 쓴 값)을 한 줄에 하나씩 JSON 으로 기록하는 추적 파일 (--trace)
+# 열려 있지 않으면 trace() 는 바로 반환하므로 평소에는 비용이 거의 없음.
+# 여러 워커가 같은 파일에 쓰므로 append + 줄 단위 버퍼로 한 줄씩 통째로 씀
+
+_trace_file = None
+
+
+def open_trace(path):
+    global _trace_file
+    close_trace()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _trace_file = open(path, 'a', encoding='utf-8', buffering=1)
+
+
+def close_trace():
+    global _trace_file
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
+
+
+def trace_enabled():
+    return _trace_file is not None
+
+
+def trace(event, **fields):
+    if _trace_file is None:
+        return
+    record = {'ts': round(time.time(), 6), 'pid': os.getpid(), 'event': event}
+    record.update(fields)
+    _trace_file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+
+atexit.register(close_trace)
@@ -0,0 +1,156 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# 단계별 실행 시간/호출 수와 카운터 (추출, 템플릿 파싱, 인코딩, 매핑, 셀 매칭, 표 생성, 저장)
+# 프로세스마다 전역 기록 하나를 쓰고, 워커의 기록은 snapshot() 으로 받아 부모에서 merge() 함.
+# perf_counter 두 번과 dict 갱신뿐이라 항상 켜 두고, --metrics 를 줄 때만 파일로 씀
+# 입력 파일마다의 기록(documents)은 document() 블록 동안 늘어난 시간/카운터를 그 파일에 더한 것
+
+_stages = {}     # stage -> [호출 수, 누적 초]
+_counters = {}   # name -> 값
+_documents = {}  # 입력 경로 -> {'seconds', 'stages': {stage: 초}, 'counters': {name: 값}}
+
+
+def add_time(stage, seconds, calls=1):
+    entry = _stages.get(stage)
+    if entry is None:
+        entry = _stages[stage] = [0, 0.0]
+    entry[0] += calls
+    entry[1] += seconds
+
+
+@contextmanager
+def timer(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(stage, time.perf_counter() - start)
+
+
+def count(name, n=1):
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def _add_document(path, seconds, stages, counters):
+    entry = _documents.get(path)
+    if entry is None:
+        entry = _documents[path] = {'seconds': 0.0, 'stages': {}, 'counters': {}}
+    entry['seconds'] += seconds
+    for stage, value in stages.items():
+        entry['stages'][stage] = entry['stages'].get(stage, 0.0) + value
+    for name, value in counters.items():
+        entry['counters'][name] = entry['counters'].get(name, 0) + value
+
+
+@contextmanager
+def document(paths, weights=None):
+    # 블록 동안 늘어난 시간/단계/카운터를 paths 의 문서 기록에 더함
+    # 여러 문서를 한 번에 처리하는 블록(묶음 매핑)은 weights 비율로 나눔 -> 그 문서들의 값은 추정치
+    stages_before = {stage: entry[1] for stage, entry in _stages.items()}
+    counters_before = dict(_counters)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stages = {stage: entry[1] - stages_before.get(stage, 0.0) for stage, entry in _stages.items()}
+        counters = {name: value - counters_before.get(name, 0) for name, value in _counters.items()}
+        stages = {stage: value for stage, value in stages.items() if value}
+        counters = {name: value for name, value in counters.items() if value}
+        weights = weights or [1] * len(paths)
+        total = sum(weights)
+        for path, weight in zip(paths, weights):
+            share = weight / total
+            if share == 1:
+                _add_document(path, seconds, stages, counters)
+            else:
+                _add_document(path, seconds * share, {stage: value * share for stage, value in stages.items()},
+                              {name: value * share for name, value in counters.items()})
+
+
+def snapshot(reset=False):
+    data = {
+        'stages': {stage: {'calls': calls, 'seconds': seconds} for stage, (calls, seconds) in _stages.items()},
+        'counters': dict(_counters),
+        'documents': {
+            path: {'seconds': entry['seconds'], 'stages': dict(entry['stages']), 'counters': dict(entry['counters'])}
+            for path, entry in _documents.items()
+        },
+    }
+    if reset:
+        _stages.clear()
+        _counters.clear()
+        _documents.clear()
+    return data
+
+
+def merge(data):
+    for stage, entry in data['stages'].items():
+        add_time(stage, entry['seconds'], entry['calls'])
+    for name, value in data['counters'].items():
+        count(name, value)
+    for path, entry in data.get('documents', {}).items():
+        _add_document(path, entry['seconds'], entry['stages'], entry['counters'])
+
+
+def hit_rates(counters):
+    rates = {}
+    for cache in ('embedding_cache', 'template_cache', 'ocr_cache'):
+        hits = counters.get(f'{cache}_hits', 0)
+        total = hits + counters.get(f'{cache}_misses', 0)
+        if total:
+            rates[f'{cache}_hit_rate'] = hits / total
+    return rates
+
+
+def report():
+    # snapshot + 캐시 적중률 같은 파생 값 (전체와 문서별)
+    data = snapshot()
+    counters = data['counters']
+    rates = hit_rates(counters)
+    documents = counters.get('documents', 0)
+    if documents:
+        rates['bytes_per_document'] = counters.get('bytes_written', 0) / documents
+    data['derived'] = rates
+    for entry in data['documents'].values():
+        entry['derived'] = hit_rates(entry['counters'])
+    return data
+
+
+def _write(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def write_json(path):
+    _write(path, json.dumps(report(), ensure_ascii=False, indent=2) + '\n')
+
+
+def prometheus_text(prefix='docx_filler'):
+    # 문서별 기록은 파일 이름이 라벨이 되어 계속 늘어나므로 JSON 에만 씀
+    data = report()
+    out = [
+        f'# TYPE {prefix}_stage_seconds_total counter',
+        *(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {entry["seconds"]:.6f}'
+          for stage, entry in sorted(data['stages'].items())),
+        f'# TYPE {prefix}_stage_calls_total counter',
+        *(f'{prefix}_stage_calls_total{{stage="{stage}"}} {entry["calls"]}'
+          for stage, entry in sorted(data['stages'].items())),
+    ]
+    for name, value in sorted(data['counters'].items()):
+        out.append(f'# TYPE {prefix}_{name}_total counter')
+        out.append(f'{prefix}_{name}_total {value}')
+    for name, value in sorted(data['derived'].items()):
+        out.append(f'# TYPE {prefix}_{name} gauge')
+        out.append(f'{prefix}_{name} {value:.6f}')
+    return '\n'.join(out) + '\n'
+
+
+def write_prometheus(path):
+    _write(path, prometheus_text())
@@ -0,0 +1,145 @@
+import hashlib
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from pdf_layout import open_pdf, word_records
+
+# 스캔 이미지(PNG/JPG/TIFF)와 글자 층이 없는 스캔 PDF 를 로컬 Tesseract 로 읽어서 줄 목록으로 (ocr_to_docs.py)
+#   pip install pytesseract pillow  +  tesseract 실행 파일과 kor 언어 데이터
+# - PDF 는 쪽마다 글자 층이 있으면 그대로 쓰고, 없으면 OCR_DPI 로 그려서 OCR
+# - OCR 단어는 pdf_layout 과 같은 방식으로 행/칸을 만들고 "항목 : 값" 을 합침 -> PDF 입력과 같은 모양의 lines
+# - 쪽 이미지 해시별로 OCR 결과(단어와 위치)를 캐시해 두고 같은 쪽은 다시 OCR 하지 않음
+# - tesseract 는 별도 프로세스로 돌기 때문에 쪽들을 스레드 풀에서 동시에 넘김 (순서는 입력 순서대로)
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')
+OCR_LANG = 'kor+eng'
+OCR_DPI = 300
+OCR_WORKERS = os.cpu_count() or 1
+OCR_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'ocr')
+# 저장 구조가 바뀌면 올려서 예전 캐시 파일을 무시하게 함
+OCR_CACHE_SCHEMA = 1
+
+
+def ocr_words(image_bytes, lang=OCR_LANG):
+    # tesseract 로 읽은 단어와 위치 [(x0, y0, x1, y1, text)]
+    import pytesseract
+    from PIL import Image
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+    words = []
+    for left, top, width, height, conf, text in zip(
+            data['left'], data['top'], data['width'], data['height'], data['conf'], data['text']):
+        text = text.strip()
+        if text and float(conf) >= 0:
+            words.append((left, top, left + width, top + height, text))
+    return words
+
+
+def cache_path_for(digest, lang, cache_dir=OCR_CACHE_DIR):
+    return os.path.join(cache_dir, f"{digest}.{lang}.v{OCR_CACHE_SCHEMA}.json")
+
+
+def load_cached_words(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [tuple(word) for word in json.load(f)]
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_cached_words(path, words):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 여러 스레드/워커가 동시에 쓸 수 있으므로 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{path}.{os.getpid()}.{id(words)}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(words, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def iter_page_tasks(source, name=None, dpi=OCR_DPI):
+    # 쪽마다 ('words', 단어 목록) (PDF 글자 층이 있는 쪽) 또는 ('image', PNG 등 이미지 바이트)
+    # source 는 파일 경로 또는 바이트 (바이트면 name 의 확장자로 형식을 정함)
+    ext = os.path.splitext(name or os.fspath(source))[1].lower()
+    if ext != '.pdf':
+        yield 'image', read_bytes(source)
+        return
+    doc = open_pdf(source)
+    try:
+        for page in doc:
+            words = page.get_text("words")
+            if words:
+                yield 'words', words
+            else:
+                yield 'image', page.get_pixmap(dpi=dpi).tobytes('png')
+    finally:
+        doc.close()
+
+
+def ocr_page(task, lang=OCR_LANG, cache_dir=OCR_CACHE_DIR):
+    # (단어 목록, 캐시 적중 여부 또는 None(OCR 안 함), OCR 시간) - metrics 는 부르는 쪽에서 한 스레드로 기록
+    kind, payload = task
+    if kind == 'words':
+        return payload, None, 0.0
+    path = cache_path_for(hashlib.sha256(payload).hexdigest(), lang, cache_dir) if cache_dir else None
+    words = load_cached_words(path) if path else None
+    if words is not None:
+        return words, True, 0.0
+    start = time.perf_counter()
+    words = ocr_words(payload, lang)
+    seconds = time.perf_counter() - start
+    if path:
+        save_cached_words(path, words)
+    return words, False, seconds
+
+
+def extract_ocr_text(source, name=None, workers=OCR_WORKERS, lang=OCR_LANG, cache_dir=OCR_CACHE_DIR, done=None):
+    # 이미지/스캔 PDF 한 개의 줄 목록 (PDF/DOCX 추출과 같은 lines)
+    # done: 줄마다 부르는 함수 (KeyTracker), True 면 아직 OCR 하지 않은 쪽은 버림
+    if workers > 1:
+        # 쪽을 동시에 돌리므로 tesseract 자체의 멀티스레드는 끔 (따로 정했으면 그대로)
+        os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    lines = []
+    with metrics.timer('ocr_extract'):
+        tasks = iter_page_tasks(source, name)
+        executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        pending = deque()
+        try:
+            while True:
+                # 한 번에 workers * 2 쪽까지만 걸어 둠 (이미지 메모리 제한)
+                for task in tasks:
+                    pending.append(executor.submit(ocr_page, task, lang, cache_dir))
+                    if len(pending) >= workers * 2:
+                        break
+                if not pending:
+                    break
+                words, hit, seconds = pending.popleft().result()
+                if hit is None:
+                    metrics.count('pdf_pages')
+                else:
+                    metrics.count('ocr_pages')
+                    metrics.count('ocr_cache_hits' if hit else 'ocr_cache_misses')
+                    if not hit:
+                        metrics.add_time('ocr', seconds)
+                for text, _ in word_records(words):
+                    lines.append(text)
+                    if done is not None and done(text):
+                        metrics.count('ocr_early_stops')
+                        return lines
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            tasks.close()
+    return lines
@@ -0,0 +1,26 @@
+import os
+from functools import partial
+
+from ocr_input import IMAGE_EXTS, OCR_CACHE_DIR, OCR_LANG, OCR_WORKERS, extract_ocr_text
+from template_filler import STOP_EARLY_HELP, filler_options_from, make_arg_parser, run_cli
+
+img_path = '/Users/kjb/Desktop/python/opensource/docx/img'
+
+def list_ocr_files(img_path):
+    # 스캔 이미지와 (스캔) PDF
+    return sorted([f for f in os.listdir(img_path) if f.lower().endswith(IMAGE_EXTS + ('.pdf',))])
+
+
+if __name__ == "__main__":
+    parser = make_arg_parser("스캔 이미지/PDF 폴더를 OCR 해서 템플릿에 맞춰 DOCX 로 변환", img_path, "ocr_to_docx.docx")
+    parser.add_argument('--ocr-lang', default=OCR_LANG, help="tesseract 언어")
+    parser.add_argument('--ocr-workers', type=int, default=OCR_WORKERS,
+                        help="동시에 OCR 할 쪽 수 (--workers 1 일 때만, 아니면 파일마다 1)")
+    parser.add_argument('--ocr-cache', default=OCR_CACHE_DIR, help="쪽 이미지별 OCR 결과 캐시 폴더 ('' 이면 캐시 안 함)")
+    parser.add_argument('--stop-early', action='store_true', help=STOP_EARLY_HELP)
+    args = parser.parse_args()
+    filler_options = dict(filler_options_from(args), stop_early=args.stop_early)
+    extract = partial(extract_ocr_text, workers=args.ocr_workers if args.workers <= 1 else 1,
+                      lang=args.ocr_lang, cache_dir=args.ocr_cache or None)
+
+    run_cli(args, extract, list_ocr_files, filler_options)
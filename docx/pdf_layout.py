@@ -0,0 +1,191 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+
+import metrics
+
+# PDF 줄 추출 (pdf_to_docs.py --pdf-mode / --pdf-workers)
+#   dict   : page.get_text("dict") 의 블록/줄 순서 그대로, span 을 " " 로 이어 붙임 (예전 방식)
+#   layout : page.get_text("words") 의 좌표로 같은 높이의 단어를 한 행으로 모으고, 행 안에서 간격이 큰 곳을
+#            칸 경계로 나눔. "항목 :" 칸 다음 칸은 값으로 보고 한 줄 "항목 : 값" 으로 합침
+#            (표/두 단 양식에서 항목과 값이 다른 블록에 있어도 매칭되도록)
+# 페이지가 많은 PDF 는 페이지 범위로 나눠 여러 프로세스에서 추출 (워커마다 문서를 따로 엶)
+# 한 프로세스에서는 iter_records 로 한 쪽씩 흘려보내고, done 을 주면 필요한 줄이 다 나왔을 때 멈춤
+
+PDF_MODES = ('layout', 'dict')
+# 이 쪽수 이상일 때만 프로세스로 나눔
+PARALLEL_MIN_PAGES = 16
+# 같은 행으로 보는 세로 중심 차이 (단어 높이 대비)
+ROW_TOLERANCE = 0.5
+# 칸 경계로 보는 가로 간격 (행 높이 대비)
+CELL_GAP = 1.0
+COLONS = (':', '：')
+# "항목 :" 또는 "항목 : 값" 의 콜론: 글자 끝이거나 뒤에 공백이 오고, 바로 앞이 숫자가 아님
+# ("10:30", "www.a.com:8080", "http://" 처럼 콜론 뒤에 바로 글자가 붙는 값은 항목이 아님)
+LABEL_RE = re.compile(r'(?<![\d:：])[:：](?=\s|$)')
+
+
+def open_pdf(source):
+    # source 는 파일 경로 또는 PDF 바이트
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype='pdf')
+    return fitz.open(source)
+
+
+def dict_records(page):
+    # 블록/줄 순서 그대로 [(text, bbox)]
+    page_dict = page.get_text("dict")
+    return [
+        (" ".join([span["text"] for span in line["spans"]]), tuple(line["bbox"]))
+        for block in page_dict["blocks"] for line in block.get("lines", [])
+    ]
+
+
+def group_rows(words):
+    # words: (x0, y0, x1, y1, text, ...) -> 위에서 아래 순서의 행 목록, 행 안은 왼쪽부터
+    rows = []
+    for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        center, height = (word[1] + word[3]) / 2, word[3] - word[1]
+        if rows:
+            row = rows[-1]
+            if abs(center - row['center']) <= ROW_TOLERANCE * max(height, row['height']):
+                row['words'].append(word)
+                count = len(row['words'])
+                row['center'] += (center - row['center']) / count
+                row['height'] = max(row['height'], height)
+                continue
+        rows.append({'center': center, 'height': height, 'words': [word]})
+    return [sorted(row['words'], key=lambda w: w[0]) for row in rows], [row['height'] for row in rows]
+
+
+def split_cells(row_words, height):
+    # 가로 간격이 행 높이보다 크면 다른 칸
+    cells = [[row_words[0]]]
+    for prev, word in zip(row_words, row_words[1:]):
+        if word[0] - prev[2] > CELL_GAP * height:
+            cells.append([word])
+        else:
+            cells[-1].append(word)
+    return [{'text': " ".join(w[4] for w in cell), 'bbox': cell_bbox(cell)} for cell in cells]
+
+
+def cell_bbox(words):
+    return (min(w[0] for w in words), min(w[1] for w in words), max(w[2] for w in words), max(w[3] for w in words))
+
+
+def is_label(text):
+    return not text.startswith(COLONS) and LABEL_RE.search(text) is not None
+
+
+def join_label_values(cells):
+    # "항목 :" | "값" 또는 "항목" | ": 값" 처럼 나뉜 칸을 한 줄로
+    # 다음 칸도 항목이면 ("나이 :" | "주소 :" | "서울" 처럼 값이 빈 칸) 합치지 않음
+    out = []
+    for cell in cells:
+        text = cell['text']
+        if out and (text.startswith(COLONS) or (out[-1]['text'].endswith(COLONS) and not is_label(text))):
+            prev = out[-1]
+            prev['text'] = f"{prev['text']} {cell['text']}"
+            prev['bbox'] = cell_bbox([prev['bbox'], cell['bbox']])
+        else:
+            out.append(dict(cell))
+    return out
+
+
+def layout_records(page):
+    # 페이지의 줄을 [(text, bbox)] 로 (위 -> 아래, 왼쪽 -> 오른쪽)
+    return word_records(page.get_text("words"))
+
+
+def word_records(words):
+    # 단어 (x0, y0, x1, y1, text, ...) 목록 -> 행/칸으로 묶은 [(text, bbox)] (OCR 단어에도 씀)
+    if not words:
+        return []
+    rows, heights = group_rows(words)
+    records = []
+    for row_words, height in zip(rows, heights):
+        records.extend((cell['text'], cell['bbox']) for cell in join_label_values(split_cells(row_words, height)))
+    return records
+
+
+def page_records(page, mode='layout'):
+    if mode == 'dict':
+        return dict_records(page)
+    return layout_records(page)
+
+
+def iter_records(source, mode='layout', start=0, stop=None):
+    # (file, page, line, bbox) 를 한 쪽씩 만들어 넘김 (file 은 경로, 바이트로 받았으면 None)
+    # 문서는 한 번만 열고, 쪽마다 만든 단어/블록 데이터는 그 쪽을 다 넘기면 버림 -> 메모리는 한 쪽 분량
+    # 중간에 그만 읽으면(generator close) 남은 쪽은 열지 않음
+    name = None if isinstance(source, (bytes, bytearray)) else os.fspath(source)
+    doc = open_pdf(source)
+    try:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for page_no in range(start, stop):
+            records = page_records(doc[page_no], mode)
+            metrics.count('pdf_pages')
+            for text, bbox in records:
+                yield name, page_no, text, bbox
+    finally:
+        doc.close()
+
+
+def extract_page_range(source, start, stop, mode='layout'):
+    return [line for _, _, line, _ in iter_records(source, mode, start, stop)]
+
+
+def _extract_range_task(task):
+    source, start, stop, mode = task
+    return extract_page_range(source, start, stop, mode), metrics.snapshot(reset=True)
+
+
+def page_ranges(page_count, parts):
+    size = -(-page_count // parts)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def page_count(source):
+    doc = open_pdf(source)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+def collect_lines(records, done=None):
+    # done(line) 이 True 를 돌려주면 (필요한 키가 다 나옴) 남은 줄/쪽은 읽지 않고 멈춤
+    lines = []
+    try:
+        for _, _, line, _ in records:
+            lines.append(line)
+            if done is not None and done(line):
+                metrics.count('pdf_early_stops')
+                break
+    finally:
+        records.close()
+    return lines
+
+
+def extract_lines(source, mode='layout', workers=1, done=None):
+    # PDF 한 개의 줄 목록. workers > 1 이고 쪽수가 많으면 페이지 범위를 프로세스에 나눠 줌
+    # (done 을 주면 앞에서부터 읽다가 멈춰야 하므로 나누지 않음)
+    with metrics.timer('pdf_get_text'):
+        if workers <= 1 or done is not None:
+            return collect_lines(iter_records(source, mode), done)
+        count = page_count(source)
+        if count < PARALLEL_MIN_PAGES:
+            return collect_lines(iter_records(source, mode))
+
+        # 경로는 그대로, 바이트는 워커마다 복사해서 넘김
+        if not isinstance(source, (bytes, bytearray)):
+            source = os.fspath(source)
+        tasks = [(source, start, stop, mode) for start, stop in page_ranges(count, workers * 2)]
+        lines = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for part, worker_metrics in executor.map(_extract_range_task, tasks):
+                lines.extend(part)
+                metrics.merge(worker_metrics)
+        return lines
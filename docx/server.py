@@ -0,0 +1,111 @@
+import argparse
+import io
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from docx_to_docx import extract_docx_text
+from ocr_input import IMAGE_EXTS, extract_ocr_text
+import metrics
+from template_filler import (
+    TEMPLATE_PATH, add_filler_arguments, filler_options_from, make_filler, save_document, setup_logging,
+)
+
+# 모델과 템플릿을 한 번만 올려 두고 요청마다 PDF/DOCX 를 받아 채워진 DOCX 를 돌려주는 상주 서버
+#
+#   python server.py --port 8765
+#   curl --data-binary @input.pdf "http://127.0.0.1:8765/convert?name=input.pdf" -o output.docx
+#   curl --data-binary @scan.png "http://127.0.0.1:8765/convert?name=scan.png" -o output.docx   (OCR)
+#   PDF 는 쪽마다 글자 층이 없으면 OCR (스캔 PDF 도 그대로 보내면 됨)
+#   curl http://127.0.0.1:8765/metrics   (단계별 시간/카운터)
+
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+logger = logging.getLogger(__name__)
+
+
+def extract_lines(data, file_name):
+    ext = os.path.splitext(file_name)[1].lower()
+    if ext == '.pdf':
+        # 글자 층이 있는 쪽은 그대로 (pdf_to_docs 의 layout 과 같은 줄), 스캔한 쪽만 OCR
+        return extract_ocr_text(data, file_name)
+    if ext == '.docx':
+        return extract_docx_text(io.BytesIO(data))
+    if ext in IMAGE_EXTS:
+        return extract_ocr_text(data, file_name)
+    raise ValueError(f"지원하지 않는 파일 형식: {file_name}")
+
+
+def convert_bytes(filler, data, file_name):
+    with metrics.timer('extract'):
+        lines = extract_lines(data, file_name)
+    doc = filler.convert(lines)
+    out = io.BytesIO()
+    save_document(doc, out)
+    return out.getvalue()
+
+
+class ConvertHandler(BaseHTTPRequestHandler):
+    def _send(self, status, body, content_type='text/plain; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send(200, b'ok')
+        elif path == '/metrics':
+            # 단계별 시간/카운터 (Prometheus 텍스트 형식)
+            self._send(200, metrics.prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4')
+        else:
+            self._send(404, b'not found')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/convert':
+            self._send(404, b'not found')
+            return
+        # 파일 이름(확장자)으로 입력 형식을 판단: ?name=... 또는 X-File-Name 헤더
+        file_name = parse_qs(url.query).get('name', [self.headers.get('X-File-Name', '')])[0]
+        length = int(self.headers.get('Content-Length', 0))
+        data = self.rfile.read(length)
+        try:
+            body = convert_bytes(self.server.filler, data, file_name)
+        except ValueError as e:
+            self._send(400, str(e).encode('utf-8'))
+            return
+        except Exception as e:
+            self._send(500, f"변환 실패: {e}".encode('utf-8'))
+            return
+        self._send(200, body, DOCX_MIME)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상주 변환 서버 (모델/템플릿을 한 번만 로드)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--template', default=TEMPLATE_PATH, help="템플릿 DOCX 경로 또는 템플릿 폴더")
+    add_filler_arguments(parser)
+    parser.add_argument('--log-level', default='WARNING', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    parser.add_argument('--trace', default=None, help="매칭 결정을 기록할 JSONL 파일 경로")
+    args = parser.parse_args()
+    setup_logging(args.log_level, args.trace)
+
+    # 모델 로드와 템플릿 파싱은 서버 시작 시 한 번만
+    server = HTTPServer((args.host, args.port), ConvertHandler)
+    server.filler = make_filler(args.template, **filler_options_from(args))
+    logger.info("listening on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import hashlib
+import os
+import pickle
+
+# 파싱된 템플릿(template_styles, text_keys, table_keys, keywords)과 키워드 임베딩을
+# 템플릿 파일 해시 기준으로 디스크에 저장해 두고, 다음 실행부터는 다시 파싱하지 않고 읽어 옴
+
+# 저장 구조가 바뀌면 올려서 예전 캐시 파일을 무시하게 함
+TEMPLATE_CACHE_SCHEMA = 6
+TEMPLATE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'templates')
+
+
+def template_hash(template_path):
+    h = hashlib.sha256()
+    with open(template_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_path_for(digest, cache_dir=TEMPLATE_CACHE_DIR):
+    return os.path.join(cache_dir, f"{digest}.pkl")
+
+
+def index_path_for(digest, cache_name, cache_dir=TEMPLATE_CACHE_DIR):
+    # 키워드 색인 파일 (템플릿 해시 + 인코더 이름별, 이름에 '/' 가 있을 수 있어서 해시로)
+    name = hashlib.sha1(cache_name.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}.{name}.v{TEMPLATE_CACHE_SCHEMA}.ivf.npz")
+
+
+def load_cached_template(digest, cache_dir=TEMPLATE_CACHE_DIR):
+    path = cache_path_for(digest, cache_dir)
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(data, dict) or data.get('schema') != TEMPLATE_CACHE_SCHEMA or data.get('hash') != digest:
+        return None
+    return data
+
+
+def save_cached_template(digest, data, cache_dir=TEMPLATE_CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    data = dict(data, schema=TEMPLATE_CACHE_SCHEMA, hash=digest)
+    path = cache_path_for(digest, cache_dir)
+    # 여러 워커가 동시에 쓸 수 있으므로 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
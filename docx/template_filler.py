@@ -0,0 +1,1165 @@
+import argparse
+import copy
+import logging
+import os
+import re
+import time
+from bisect import bisect_right
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+from docx import Document
+from docx.enum.section import WD_ORIENT, WD_SECTION
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Pt, RGBColor, Inches, Cm, Emu
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from embedding_cache import EmbeddingCache, normalize_text
+from encoders import DEFAULT_THRESHOLDS, ENCODER_BACKENDS, make_encoder
+from line_matcher import KeyTracker, LineMatcher
+from match_trace import open_trace, trace, trace_enabled
+import metrics
+from keyword_index import KEYWORD_INDEX_BACKENDS, build_keyword_index
+from template_cache import (
+    TEMPLATE_CACHE_DIR, index_path_for, load_cached_template, save_cached_template, template_hash,
+)
+from template_model import (
+    BORDER_SIDES, CELL_BORDER_SIDES, Cell, Run, VMerge, from_align, intern_border, intern_border_set,
+    intern_run_style, to_align,
+)
+from template_model import Paragraph as TemplateParagraph, Table as TemplateTable
+
+# docx_to_docx.py / pdf_to_docs.py 가 같이 쓰는 템플릿 파싱, 키워드 매핑, 문서 복원 로직
+
+TEMPLATE_PATH = "/Users/kjb/Desktop/python/opensource/docx/template_docx/보고서.docx"
+MODEL_NAME = "jhgan/ko-sbert-nli"
+EMBEDDING_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'embeddings.sqlite3')
+# 한 번에 인코딩할 조각 수 (CPU 메모리 기준으로 조절)
+ENCODE_BATCH_SIZE = 256
+# 스트리밍 변환에서 한 번에 묶어서 매핑할 파일 수
+MAP_CHUNK_FILES = 16
+
+# 진행/매칭 로그. 기본은 WARNING 이라 표/셀마다 찍는 debug 로그는 나오지 않음 (--log-level DEBUG)
+logger = logging.getLogger(__name__)
+
+def get_grid_span(cell):
+    tc = cell._tc
+    grid_span = tc.xpath('.//w:gridSpan')
+    if grid_span:
+        return int(grid_span[0].get(qn('w:val')))
+    return 1
+
+def get_vmerge_type(cell):
+    tc = cell._tc
+    v_merge = tc.xpath('.//w:vMerge')
+    if v_merge:
+        val = v_merge[0].get(qn('w:val'))
+        return VMerge.RESTART if val == 'restart' else VMerge.CONTINUE
+    return VMerge.NONE
+
+def parse_border_sides(borders, sides):
+    # w:tblBorders / w:tcBorders -> 공유 테두리 묶음 ((side, Border), ...)
+    pairs = []
+    for side in sides:
+        el = borders.find(qn(f'w:{side}'))
+        if el is not None:
+            pairs.append((side, intern_border(
+                el.get(qn('w:val')), el.get(qn('w:sz')), el.get(qn('w:color')), el.get(qn('w:space'))
+            )))
+    return intern_border_set(pairs)
+
+def get_table_border_info(table):
+    tblPr = table._element.find(qn('w:tblPr'))
+    if tblPr is not None:
+        tblBorders = tblPr.find(qn('w:tblBorders'))
+        if tblBorders is not None:
+            return parse_border_sides(tblBorders, BORDER_SIDES)
+    return None
+
+def get_cell_border_info(cell, table_border_info=None):
+    tc = cell._tc
+    tcPr = tc.get_or_add_tcPr()
+    border_info = None
+    borders = tcPr.find(qn('w:tcBorders'))
+    if borders is not None:
+        border_info = parse_border_sides(borders, CELL_BORDER_SIDES)
+    # 셀에 테두리 정보 없으면 표 전체 테두리 정보로 fallback
+    if not border_info and table_border_info:
+        border_info = intern_border_set([
+            (side, border) for side, border in table_border_info if side in CELL_BORDER_SIDES
+        ])
+    return border_info
+
+def get_cell_style_info(cell, table_border_info=None):
+    # (테두리 묶음, 셀 너비, 행 높이), 너비/높이는 twips 이고 지정이 없으면 None
+    tc = cell._tc
+    tcPr = tc.get_or_add_tcPr()
+    width = None
+    tcW = tcPr.find(qn('w:tcW'))
+    if tcW is not None and tcW.get(qn('w:w')) is not None:
+        width = float(tcW.get(qn('w:w')))
+    tr = tc.getparent()
+    trPr = tr.find(qn('w:trPr')) if tr is not None else None
+    height = None
+    if trPr is not None:
+        trHeight = trPr.find(qn('w:trHeight'))
+        if trHeight is not None and trHeight.get(qn('w:val')) is not None:
+            height = float(trHeight.get(qn('w:val')))
+    return get_cell_border_info(cell, table_border_info), width, height
+
+def parse_run(run):
+    color = run.font.color.rgb
+    style = intern_run_style(
+        run.font.name,
+        run.font.size.pt if run.font.size else None,
+        run.bold,
+        run.italic,
+        run.underline,
+        str(color) if color is not None else None,
+    )
+    return Run(run.text, style)
+
+def parse_paragraph(p, text_keys=None):
+    runs = tuple(parse_run(run) for run in p.runs)
+    full_text = ''.join(run.text for run in runs)
+    if text_keys is not None:
+        text_keys.append(full_text)
+    return TemplateParagraph(full_text, to_align(p.alignment), runs)
+
+def parse_table(table, table_index, table_keys=None, table_border_info=None):
+    table_entries = []
+    if table_border_info is None:
+        table_border_info = get_table_border_info(table)
+    above = {}
+    for row_index, row in enumerate(table.rows):
+        current = {}
+        for col_index, cell in enumerate(row.cells):
+            # row.cells 는 vMerge continue 칸에 위쪽 시작 셀(w:tc)을 그대로 돌려주므로
+            # 위 행의 같은 열과 같은 w:tc 면 continue 로 봄 (시작 셀의 w:vMerge 만 보면 둘 다 restart)
+            tc = current[col_index] = cell._tc
+            vmerge = VMerge.CONTINUE if above.get(col_index) is tc else get_vmerge_type(cell)
+            borders, width, height = get_cell_style_info(cell, table_border_info)
+            paragraphs = tuple(parse_paragraph(p) for p in cell.paragraphs)
+            # 셀의 모든 문단 텍스트를 합쳐서 키로 등록
+            merged_text = ''.join(para.text for para in paragraphs).strip()
+            if table_keys is not None and merged_text:
+                table_keys.append(merged_text)
+            table_entries.append(Cell(
+                row_index, col_index, get_grid_span(cell), vmerge,
+                borders, width, height, paragraphs
+            ))
+        above = current
+    return table_entries
+
+R_NS_PREFIX = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+def has_relationship_refs(element):
+    return any(key.startswith(R_NS_PREFIX) for el in element.iter() for key in el.attrib)
+
+def split_body_by_section(doc, text_keys, table_keys):
+    # 본문을 한 번만 순회하면서 w:sectPr 경계로 섹션별 내용을 나눔
+    # (문단 안의 w:pPr/w:sectPr 는 그 문단까지가 한 섹션, 마지막 섹션은 body 의 w:sectPr)
+    section_contents = []
+    content = []
+    tbl_idx = 0
+    for block in doc.element.body:
+        if block.tag == qn('w:p'):
+            p = Paragraph(block, doc)
+            para = parse_paragraph(p, text_keys)
+            content.append(para)
+            if block.find(qn('w:pPr') + '/' + qn('w:sectPr')) is not None:
+                section_contents.append(content)
+                content = []
+        elif block.tag == qn('w:tbl'):
+            t = Table(block, doc)
+            table_border_info = get_table_border_info(t)
+            cells = parse_table(t, tbl_idx, table_keys, table_border_info)
+            # 그림/하이퍼링크처럼 템플릿 패키지의 관계(r:embed, r:id ...)를 가리키는 표는 복제하면 새 문서에서
+            # 대상이 없는 참조가 되므로 xml 을 두지 않음 -> --clone-tables 여도 새로 만드는 경로를 씀
+            xml = None if has_relationship_refs(block) else etree.tostring(block)
+            content.append(TemplateTable(tbl_idx, table_border_info, tuple(cells), xml))
+            tbl_idx += 1
+    section_contents.append(content)
+    return section_contents
+
+def load_template(template_path):
+    with metrics.timer('template_parse'):
+        return _load_template(template_path)
+
+def _load_template(template_path):
+    # 페이지(섹션) 단위 템플릿 구조 생성
+    doc = Document(template_path)
+    template_styles = []
+    text_keys = []
+    table_keys = []
+    section_contents = split_body_by_section(doc, text_keys, table_keys)
+
+    # 모든 페이지(섹션) 기준으로 반복
+    for page_index, (section, content) in enumerate(zip(doc.sections, section_contents)):
+        page_style = {
+            'source': 'page',
+            'page_index': page_index,
+            'page_settings': {
+                'page_width_cm': round(section.page_width.cm, 2),
+                'page_height_cm': round(section.page_height.cm, 2),
+                'orientation': 'landscape' if section.orientation == 1 else 'portrait',
+                'top_margin_cm': round(section.top_margin.cm, 2),
+                'bottom_margin_cm': round(section.bottom_margin.cm, 2),
+                'left_margin_cm': round(section.left_margin.cm, 2),
+                'right_margin_cm': round(section.right_margin.cm, 2),
+                'header_distance_cm': round(section.header_distance.cm, 2),
+                'footer_distance_cm': round(section.footer_distance.cm, 2),
+                'gutter_cm': round(section.gutter.cm, 2),
+            },
+            # 이 섹션에 속한 문단/표만
+            'content': content
+        }
+
+        # 이 페이지를 전체 리스트에 추가
+        template_styles.append(page_style)
+    text_keys = list(dict.fromkeys(text_keys))
+    table_keys = list(dict.fromkeys(table_keys))
+    return template_styles, text_keys, table_keys
+
+def load_template_cached(template_path, cache_dir=TEMPLATE_CACHE_DIR):
+    # 템플릿 파일 해시로 캐시를 찾고, 없거나 스키마가 다르면 새로 파싱해서 저장
+    digest = template_hash(template_path)
+    data = load_cached_template(digest, cache_dir)
+    metrics.count('template_cache_misses' if data is None else 'template_cache_hits')
+    if data is None:
+        template_styles, text_keys, table_keys = load_template(template_path)
+        data = {
+            'template_styles': template_styles,
+            'text_keys': text_keys,
+            'table_keys': table_keys,
+            'keywords': build_keywords(text_keys, table_keys),
+            # 모델 이름별 키워드 임베딩
+            'keyword_emb': {},
+        }
+        save_cached_template(digest, data, cache_dir)
+    return digest, data
+
+# 표 셀 키와 같은 규칙: 글자/숫자/공백/한글 외의 문자(콜론, 괄호 등)는 지움
+KEY_STRIP_RE = re.compile(r'[^\w\sㄱ-ㅎ가-힣]')
+KEY_SPACE_RE = re.compile(r'\s+')
+
+def strip_key(text):
+    return KEY_STRIP_RE.sub('', text)
+
+def normalize_key(text):
+    # 매핑 사전 조회용: NFC + 기호 제거 + 공백 제거 ("성 명 :" -> "성명")
+    return KEY_SPACE_RE.sub('', strip_key(normalize_text(text)))
+
+def split_meaningful(text):
+    # "항목 : 값" 패턴에서 의미 단위로 분리 (키워드와 같이 전각 콜론도 구분자로 봄)
+    parts = re.split(r'\s*([:：])\s*', text)
+    return parts
+
+def build_keywords(text_keys, table_keys):
+    keywords = text_keys + table_keys
+    return [
+        part for keyword in keywords
+        for part in re.split(r'\s*[:：]\s*', keyword)
+        if part
+    ]
+
+def template_key_counts(template_styles):
+    # restore 에서 찾는 키와 횟수 (문단: 문단 글자 그대로, 표 셀: 기호를 뺀 글자), 표 셀 키 집합
+    # 표는 restore 처럼 가로 병합으로 이어지는 칸과 세로 병합 아래 칸은 세지 않음
+    needed = Counter()
+    cell_keys = set()
+    for styles in template_styles:
+        if styles['source'] != 'page':
+            continue
+        for item in styles['content']:
+            if item.source == 'text':
+                if item.text:
+                    needed[item.text] += 1
+                continue
+            skip_cells = set()
+            for cell in item.cells:
+                if (cell.row, cell.col) in skip_cells:
+                    continue
+                skip_cells.update((cell.row, cell.col + k) for k in range(1, cell.grid_span))
+                key = strip_key(cell.paragraphs[0].text)
+                if key and cell.vmerge != VMerge.CONTINUE:
+                    needed[key] += 1
+                    cell_keys.add(key)
+    return needed, cell_keys
+
+def set_section_settings(section, page_settings):
+    # page_settings 예시: {'page_width_cm': 21.0, ...}
+    if 'orientation' in page_settings:
+        if page_settings['orientation'] == 'landscape':
+            section.orientation = WD_ORIENT.LANDSCAPE
+        else:
+            section.orientation = WD_ORIENT.PORTRAIT
+    if 'page_width_cm' in page_settings:
+        section.page_width = Cm(page_settings['page_width_cm'])
+    if 'page_height_cm' in page_settings:
+        section.page_height = Cm(page_settings['page_height_cm'])
+    if 'top_margin_cm' in page_settings:
+        section.top_margin = Cm(page_settings['top_margin_cm'])
+    if 'bottom_margin_cm' in page_settings:
+        section.bottom_margin = Cm(page_settings['bottom_margin_cm'])
+    if 'left_margin_cm' in page_settings:
+        section.left_margin = Cm(page_settings['left_margin_cm'])
+    if 'right_margin_cm' in page_settings:
+        section.right_margin = Cm(page_settings['right_margin_cm'])
+    if 'header_distance_cm' in page_settings:
+        section.header_distance = Cm(page_settings['header_distance_cm'])
+    if 'footer_distance_cm' in page_settings:
+        section.footer_distance = Cm(page_settings['footer_distance_cm'])
+    if 'gutter_cm' in page_settings:
+        section.gutter = Cm(page_settings['gutter_cm'])
+
+# --- 스타일 및 레이아웃 적용 함수 ---
+def set_border_sides(borders, border_info):
+    # border_info: ((side, Border), ...)
+    for side, style in border_info:
+        side_el = borders.find(qn(f'w:{side}'))
+        if side_el is None:
+            side_el = OxmlElement(f'w:{side}')
+            borders.append(side_el)
+        side_el.set(qn('w:val'), style.val or 'single')
+        side_el.set(qn('w:sz'), style.sz or '4')
+        side_el.set(qn('w:color'), style.color or '000000')
+        if style.space:
+            side_el.set(qn('w:space'), style.space)
+
+def apply_table_borders(tbl, border_info):
+    if not border_info:
+        return
+    tblPr = tbl.find(qn('w:tblPr'))
+    if tblPr is None:
+        tblPr = OxmlElement('w:tblPr')
+        tbl.insert(0, tblPr)
+    tblBorders = tblPr.find(qn('w:tblBorders'))
+    if tblBorders is None:
+        tblBorders = OxmlElement('w:tblBorders')
+        tblPr.append(tblBorders)
+    set_border_sides(tblBorders, border_info)
+
+def apply_cell_border(tcPr, border_info):
+    if not border_info:
+        return
+    borders = tcPr.find(qn('w:tcBorders'))
+    if borders is None:
+        borders = OxmlElement('w:tcBorders')
+        tcPr.append(borders)
+    set_border_sides(borders, border_info)
+
+def set_cell_vertical_margins(tcPr, margin_top=0, margin_bottom=0):
+    tcMar = tcPr.find(qn('w:tcMar'))
+    if tcMar is None:
+        tcMar = OxmlElement('w:tcMar')
+        tcPr.append(tcMar)
+    for side, value in (('top', margin_top), ('bottom', margin_bottom)):
+        el = tcMar.find(qn(f'w:{side}'))
+        if el is None:
+            el = OxmlElement(f'w:{side}')
+            tcMar.append(el)
+        el.set(qn('w:w'), str(value))
+        el.set(qn('w:type'), 'dxa')
+
+# --- 표 XML 직접 생성 ---
+# doc.add_table + table.cell() + merge() 는 셀 프록시를 매번 다시 만들어서 느리므로,
+# 격자 모델(layout)에 병합/테두리/글을 기록해 두었다가 w:tbl 을 한 번에 만든다.
+# layout['tcs']: 실제로 만들 w:tc (시작 위치 기준), layout['owner']: 격자 위치 -> 그 위치에 글을 쓸 w:tc
+
+def new_table_layout(cells, block_width):
+    max_row = max(cell.row for cell in cells) + 1
+    max_col = max(cell.col for cell in cells) + 1
+
+    # 열 너비, 행 높이
+    col_widths = [0] * max_col
+    row_heights = [0] * max_row
+    for cell in cells:
+        if cell.width is not None:
+            col_widths[cell.col] = max(col_widths[cell.col], cell.width)
+        if cell.height is not None:
+            row_heights[cell.row] = max(row_heights[cell.row], cell.height)
+
+    # 너비 정보가 없는 열은 python-docx 의 add_table 과 같이 본문 폭을 균등 분배
+    default_width = Emu(block_width // max_col).twips
+    tcs = {}
+    owner = {}
+    for r in range(max_row):
+        for c in range(max_col):
+            tcs[(r, c)] = {
+                'span': 1,
+                'vmerge': None,
+                'width': int(col_widths[c]) if col_widths[c] else default_width,
+                'border_infos': [],
+                'margins': False,
+                'p': OxmlElement('w:p'),
+            }
+            owner[(r, c)] = (r, c)
+    return {
+        'rows': max_row,
+        'cols': max_col,
+        'col_widths': col_widths,
+        'row_heights': row_heights,
+        'default_width': default_width,
+        'tcs': tcs,
+        'owner': owner,
+    }
+
+def layout_cell(layout, row, col):
+    # (row, col) 위치에 글을 쓸 셀 (병합된 위치면 병합된 셀)
+    return layout['tcs'][layout['owner'][(row, col)]]
+
+def _is_single_cell(layout, pos):
+    tc = layout['tcs'].get(pos)
+    return tc is not None and tc['span'] == 1 and tc['vmerge'] is None and layout['owner'][pos] == pos
+
+def merge_right(layout, row, col, grid_span):
+    # (row, col) 부터 오른쪽으로 grid_span 칸 가로 병합. 병합할 수 없으면 False
+    if col + grid_span > layout['cols'] or layout['owner'][(row, col)] != (row, col):
+        return False
+    if not all(_is_single_cell(layout, (row, c)) for c in range(col + 1, col + grid_span)):
+        return False
+    tc = layout['tcs'][(row, col)]
+    for c in range(col + 1, col + grid_span):
+        other = layout['tcs'].pop((row, c))
+        tc['width'] += other['width']
+        tc['span'] += 1
+        layout['owner'][(row, c)] = (row, col)
+    return True
+
+def merge_down(layout, row, col, next_row):
+    # (row, col) 셀을 next_row 행까지 세로 병합. 아래 셀은 vMerge continue 로 남고 글은 위 셀에 씀
+    if next_row >= layout['rows'] or layout['owner'][(row, col)] != (row, col):
+        return False
+    top = layout['tcs'][(row, col)]
+    positions = [(next_row, c) for c in range(col, col + top['span'])]
+    if not all(_is_single_cell(layout, pos) for pos in positions):
+        return False
+    lower = layout['tcs'][(next_row, col)]
+    for pos in positions[1:]:
+        lower['width'] += layout['tcs'].pop(pos)['width']
+    lower['span'] = top['span']
+    lower['vmerge'] = 'continue'
+    top['vmerge'] = 'restart'
+    for pos in positions:
+        layout['owner'][pos] = (row, col)
+    return True
+
+def build_table_xml(layout, table_border_info):
+    tbl = OxmlElement('w:tbl')
+    tblPr = etree.SubElement(tbl, qn('w:tblPr'))
+    etree.SubElement(tblPr, qn('w:tblW'), {qn('w:type'): 'auto', qn('w:w'): '0'})
+    etree.SubElement(tblPr, qn('w:tblLook'), {
+        qn('w:firstColumn'): '1', qn('w:firstRow'): '1', qn('w:lastColumn'): '0',
+        qn('w:lastRow'): '0', qn('w:noHBand'): '0', qn('w:noVBand'): '1', qn('w:val'): '04A0',
+    })
+    apply_table_borders(tbl, table_border_info)
+
+    tblGrid = etree.SubElement(tbl, qn('w:tblGrid'))
+    for width in layout['col_widths']:
+        gridCol = OxmlElement('w:gridCol')
+        tblGrid.append(gridCol)
+        if width:
+            gridCol.w = Inches(int(width) / 20 / 72)
+        else:
+            gridCol.set(qn('w:w'), str(layout['default_width']))
+
+    for r in range(layout['rows']):
+        tr = etree.SubElement(tbl, qn('w:tr'))
+        height = layout['row_heights'][r]
+        if height:
+            trPr = etree.SubElement(tr, qn('w:trPr'))
+            etree.SubElement(trPr, qn('w:trHeight'), {qn('w:val'): str(int(height)), qn('w:hRule'): 'exact'})
+        for c in range(layout['cols']):
+            cell = layout['tcs'].get((r, c))
+            if cell is None:
+                continue
+            tc = etree.SubElement(tr, qn('w:tc'))
+            tcPr = etree.SubElement(tc, qn('w:tcPr'))
+            etree.SubElement(tcPr, qn('w:tcW'), {qn('w:type'): 'dxa', qn('w:w'): str(cell['width'])})
+            if cell['span'] > 1:
+                etree.SubElement(tcPr, qn('w:gridSpan'), {qn('w:val'): str(cell['span'])})
+            if cell['vmerge']:
+                etree.SubElement(tcPr, qn('w:vMerge'), {qn('w:val'): cell['vmerge']})
+            for border_info in cell['border_infos']:
+                apply_cell_border(tcPr, border_info)
+            if cell['margins']:
+                set_cell_vertical_margins(tcPr)
+            tc.append(cell['p'])
+    return tbl
+
+def write_cell_text(p, cell_para, final_text):
+    # 새로 만든 셀 문단에 템플릿 셀의 첫 run 서식으로 값을 씀
+    para = Paragraph(p, None)
+    if cell_para.runs:
+        para.alignment = from_align(cell_para.alignment)
+        run_data = cell_para.runs[0].style
+        run = para.add_run(final_text)
+        run.font.name = run_data.font_name
+        if run_data.font_size:
+            run.font.size = Pt(run_data.font_size)
+        run.bold = run_data.bold
+        run.italic = run_data.italic
+        run.underline = run_data.underline
+        if run_data.color:
+            run.font.color.rgb = RGBColor.from_string(run_data.color)
+    else:
+        run = para.add_run(final_text)
+        run.font.name = '맑은 고딕'
+        run.font.size = Pt(10.5)
+        run.bold = False
+        run.italic = False
+        run.underline = False
+
+# --- 템플릿 표 복제 (--clone-tables) ---
+# 같은 템플릿으로 많은 문서를 만들 때는 원본 w:tbl 을 복사하고 값만 w:t 에 써 넣는 것이 가장 빠르고 레이아웃도 그대로임
+_template_tbl_cache = {}
+
+def _template_tbl(xml):
+    # 원본 표 XML 은 템플릿마다 한 번만 파싱
+    tbl = _template_tbl_cache.get(xml)
+    if tbl is None:
+        tbl = _template_tbl_cache[xml] = parse_xml(xml)
+    return tbl
+
+def map_tbl_cells(tbl):
+    # python-docx 의 row.cells 와 같은 규칙으로 (row, col) -> 내용이 들어 있는 w:tc
+    # (가로 병합 셀은 여러 칸에 반복, vMerge continue 는 위쪽 시작 셀)
+    positions = {}
+    above = {}
+    for row_index, tr in enumerate(tbl.tr_lst):
+        current = {}
+        offset = tr.grid_before
+        col = 0
+        for tc in tr.tc_lst:
+            root = above.get(offset, tc) if tc.vMerge == 'continue' else tc
+            for _ in range(root.grid_span):
+                positions[(row_index, col)] = root
+                col += 1
+            current[offset] = root
+            offset += tc.grid_span
+        above = current
+    return positions
+
+def set_tc_text(tc, text):
+    # 셀 첫 문단의 글자를 text 로 바꿈. 기존 w:t 가 있으면 첫 번째에 쓰고 나머지는 비움
+    p = tc.find(qn('w:p'))
+    if p is None:
+        p = etree.SubElement(tc, qn('w:p'))
+    t_nodes = p.findall('.//' + qn('w:t'))
+    if ''.join(t.text or '' for t in t_nodes) == text:
+        return
+    if t_nodes:
+        t_nodes[0].text = text
+        t_nodes[0].set(qn('xml:space'), 'preserve')
+        for t in t_nodes[1:]:
+            t.text = ''
+        return
+    r = etree.SubElement(p, qn('w:r'))
+    # 빈 셀은 문단 기호 서식(pPr/rPr)을 글자 서식으로 사용
+    mark_rPr = p.find(qn('w:pPr') + '/' + qn('w:rPr'))
+    if mark_rPr is not None:
+        r.append(copy.deepcopy(mark_rPr))
+    t = etree.SubElement(r, qn('w:t'))
+    t.text = text
+    t.set(qn('xml:space'), 'preserve')
+
+def clone_table_xml(xml, writes):
+    tbl = copy.deepcopy(_template_tbl(xml))
+    positions = map_tbl_cells(tbl)
+    # 병합 셀은 여러 (row, col) 가 같은 w:tc 를 가리키므로, 템플릿 순서로 처음 쓴 값만 남김
+    # (build 경로도 병합된 칸은 시작 위치의 값만 씀)
+    texts = {}
+    for row, col, text in writes:
+        tc = positions.get((row, col))
+        if tc is not None and id(tc) not in texts:
+            texts[id(tc)] = (tc, text)
+    for tc, text in texts.values():
+        set_tc_text(tc, text)
+    return tbl
+
+def build_table_index(cells):
+    # (row, col) -> 셀, 열마다 빈 셀 인덱스 목록(오름차순). 병합/값 채우기에서 셀 목록을 매번 훑지 않도록 표마다 한 번 만듦
+    grid = {}
+    empty_by_col = {}
+    for i, cell in enumerate(cells):
+        grid[(cell.row, cell.col)] = cell
+        if cell.paragraphs[0].text == '':
+            empty_by_col.setdefault(cell.col, []).append(i)
+    return grid, empty_by_col
+
+# --- 문서 생성 및 텍스트 채우기 ---
+def restore_doc_from_template_and_ocr(template_styles, doc, lines, clone_tables=False):
+    # lines 는 줄 목록 또는 (여러 섹션에서 같이 쓰는) LineMatcher
+    matcher = lines if isinstance(lines, LineMatcher) else LineMatcher(lines)
+    # 새 표의 기본 열 너비 계산용 본문 폭 (현재 섹션 기준)
+    section = doc.sections[-1]
+    block_width = section.page_width - section.left_margin - section.right_margin
+    tracing = trace_enabled()
+
+    for item in template_styles['content']:
+        if item.source == 'text':
+            para = doc.add_paragraph()
+            para.alignment = from_align(item.alignment)
+            cell_key = item.text
+            matched_line = matcher.find(cell_key)
+            final_text = matched_line if matched_line else cell_key
+            logger.debug("text: key=%r matched=%r final=%r styled=%s", cell_key, matched_line, final_text, bool(item.runs))
+            if tracing:
+                trace('text', key=cell_key, matched=matched_line, value=final_text)
+
+            run = para.add_run(final_text)
+            if item.runs:
+                run_style = item.runs[0].style
+                run.font.name = run_style.font_name
+                if run_style.font_size:
+                    run.font.size = Pt(run_style.font_size)
+                run.bold = run_style.bold
+                run.italic = run_style.italic
+                run.underline = run_style.underline
+                if run_style.color:
+                    run.font.color.rgb = RGBColor.from_string(run_style.color)
+                rPr = run._element.get_or_add_rPr()
+                rFonts = rPr.find(qn('w:rFonts'))
+                if rFonts is None:
+                    rFonts = OxmlElement('w:rFonts')
+                    rPr.append(rFonts)
+                if run_style.font_name:
+                    rFonts.set(qn('w:eastAsia'), run_style.font_name)
+            else:
+                run.font.name = '맑은 고딕'
+                run.font.size = Pt(10.5)
+                run.bold = False
+                run.italic = False
+                run.underline = False
+
+        elif item.source == 'table':
+            logger.debug("table %d: %d cells", item.table_index, len(item.cells))
+            table_start = time.perf_counter()
+            cells = item.cells
+            # 채운 값은 템플릿을 건드리지 않도록 표마다 따로 보관 (템플릿은 여러 문서에 재사용됨)
+            filled_values = {}
+            skip_cells = set()  # 표 셀 병합시 중복 방지
+            grid, empty_by_col = build_table_index(cells)
+            layout = new_table_layout(cells, block_width)
+            writes = []  # (row, col, 쓸 셀, 셀 인덱스, 값)
+            match_start = time.perf_counter()
+
+            for idx, cell in enumerate(cells):
+                row, col = cell.row, cell.col
+                if (row, col) in skip_cells:
+                    continue
+                tcell = layout_cell(layout, row, col)
+                if cell.borders:
+                    tcell['border_infos'].append(cell.borders)
+                tcell['margins'] = True
+
+                grid_span = cell.grid_span
+                if grid_span > 1 and merge_right(layout, row, col, grid_span):
+                    for k in range(1, grid_span):
+                        skip_cells.add((row, col + k))
+
+                if cell.vmerge == VMerge.RESTART:
+                    for k in range(1, 20):
+                        next_row = row + k
+                        match_entry = grid.get((next_row, col))
+                        if not match_entry or match_entry.vmerge != VMerge.CONTINUE:
+                            break
+                        if not merge_down(layout, row, col, next_row):
+                            break
+                        skip_cells.add((next_row, col))
+                if cell.vmerge == VMerge.CONTINUE:
+                    continue
+
+                raw_text = cell.paragraphs[0].text
+                cell_key = strip_key(raw_text)
+                matched_line = matcher.consume(cell_key)
+                value_pos = None  # "항목 : 값" 의 값을 옮겨 쓴 셀 위치
+                if matched_line:
+                    match = re.match(rf"{re.escape(raw_text)}\s*[:：]\s*(.*)", matched_line)
+                    if match:
+                        next_filled_value = match.group(1).strip()
+                        current_text = raw_text
+                        filled_values[idx] = current_text
+                        if idx + 1 < len(cells):
+                            next_cell = cells[idx + 1]
+                            if next_cell.grid_span == 1 and next_cell.paragraphs[0].text == '' and next_cell.row == cell.row:
+                                filled_values[idx + 1] = next_filled_value
+                                row = next_cell.row
+                                col = next_cell.col
+                                cell_pos = value_pos = (row, col)
+                                if cell_pos in skip_cells:
+                                    skip_cells.remove(cell_pos)
+                            else:
+                                # 같은 열에서 idx 뒤에 오는 첫 번째 빈 셀
+                                empty_idxs = empty_by_col.get(cell.col, [])
+                                pos = bisect_right(empty_idxs, idx)
+                                if pos < len(empty_idxs):
+                                    j = empty_idxs[pos]
+                                    filled_values[j] = next_filled_value
+                                    row = cells[j].row
+                                    col = cells[j].col
+                                    cell_pos = value_pos = (row, col)
+                                    if cell_pos in skip_cells:
+                                        skip_cells.remove(cell_pos)
+                    else:
+                        current_text = matched_line
+                        filled_values[idx] = current_text
+                else:
+                    if idx not in filled_values:
+                        filled_values[idx] = raw_text
+
+                final_text = filled_values[idx]
+                logger.debug("cell (%d, %d): key=%r matched=%r final=%r value_cell=%s",
+                             cell.row, cell.col, cell_key, matched_line, final_text, value_pos)
+                if tracing:
+                    trace('cell', table=item.table_index, row=cell.row, col=cell.col, key=cell_key,
+                          matched=matched_line, value=final_text, value_cell=value_pos,
+                          value_text=next_filled_value if value_pos else None)
+                writes.append((cell.row, cell.col, tcell, idx, final_text))
+
+            build_start = time.perf_counter()
+            cloned = clone_tables and item.xml is not None
+            logger.debug("table %d: %s", item.table_index, 'clone' if cloned else 'build')
+            if tracing:
+                trace('table', table=item.table_index, path='clone' if cloned else 'build')
+            if cloned:
+                # 템플릿 표를 그대로 복제하고 값만 써 넣음 (서식/병합 작업 없음)
+                tbl = clone_table_xml(item.xml, [(r, c, text) for r, c, _, _, text in writes])
+            else:
+                for _, _, tcell, idx, final_text in writes:
+                    write_cell_text(tcell['p'], cells[idx].paragraphs[0], final_text)
+                tbl = build_table_xml(layout, item.borders)
+            doc.element.body._insert_tbl(tbl)
+            metrics.add_time('cell_match', build_start - match_start)
+            metrics.add_time('table_build', (match_start - table_start) + (time.perf_counter() - build_start))
+            metrics.count('cells', len(cells))
+    doc.add_page_break()
+
+def fill_document(doc, template_styles, lines, first_section=True, clone_tables=False, match_window=None):
+    # 입력 문서 하나를 템플릿의 모든 페이지(섹션)에 맞춰 doc 에 이어 붙임
+    # 줄 색인은 입력마다 한 번만 만들고, 표 셀에서 쓴 줄은 다음 섹션에서도 제외됨
+    # match_window: 입력 줄이 문서 순서일 때 마지막으로 찾은 줄 근처(window 줄)를 먼저 찾음 (LineMatcher 참고)
+    matcher = LineMatcher(lines, match_window)
+    for template_idx, styles in enumerate(template_styles):
+        if styles['source'] != 'page':
+            continue
+
+        # 각 템플릿별 섹션 추가
+        if first_section and template_idx == 0:
+            section = doc.sections[0]
+        else:
+            section = doc.add_section(0)
+
+        logger.debug("템플릿 %d 적용", template_idx + 1)
+        set_section_settings(section, styles['page_settings'])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("남은 줄: %s", matcher.remaining())
+        with metrics.timer('fill'):
+            restore_doc_from_template_and_ocr(styles, doc, matcher, clone_tables)
+
+class TemplateFiller:
+    # 인코더, 파싱된 템플릿, 키워드 임베딩을 한 번만 올려 두고 여러 문서에 재사용
+    # 인코더(모델)와 키워드 임베딩은 정확히 일치하지 않는 조각이 처음 나올 때 준비함
+    def __init__(self, template_path=TEMPLATE_PATH, model=None, model_name=MODEL_NAME,
+                 cache_path=EMBEDDING_CACHE_PATH, template_cache_dir=TEMPLATE_CACHE_DIR, clone_tables=False,
+                 encoder='sbert', onnx_path=None, threshold=None, keyword_index='auto', stop_early=False,
+                 match_window=None):
+        self.template_path = template_path
+        self.template_cache_dir = template_cache_dir
+        self.clone_tables = clone_tables
+        self.match_window = match_window
+        self.template_hash, self._template_data = load_template_cached(template_path, template_cache_dir)
+        self.template_styles = self._template_data['template_styles']
+        self.text_keys = self._template_data['text_keys']
+        self.table_keys = self._template_data['table_keys']
+        self.keywords = self._template_data['keywords']
+        # 조각이 키워드와 글자 그대로 같거나, 기호/공백을 뺀 키가 같으면 모델 없이 바로 매핑
+        # (같은 키의 키워드가 여러 개면 앞의 것)
+        self.exact_keywords = {}
+        self.normalized_keywords = {}
+        for keyword in self.keywords:
+            self.exact_keywords.setdefault(normalize_text(keyword), keyword)
+            key = normalize_key(keyword)
+            if key:
+                self.normalized_keywords.setdefault(key, keyword)
+
+        if model is not None:
+            self.model = model
+            cache_name = getattr(model, 'cache_name', model_name)
+        else:
+            self.model = make_encoder(encoder, model_name, onnx_path)
+            cache_name = self.model.cache_name
+        if hasattr(self.model, 'fit'):
+            self.model.fit(self.keywords)
+        self.cache_name = cache_name
+        self.threshold = threshold if threshold is not None else DEFAULT_THRESHOLDS.get(encoder, 0.7)
+        # cache_name 이 None 인 인코더(tfidf)는 계산이 싸서 캐시하지 않음
+        self.embedding_cache = EmbeddingCache(cache_path, cache_name) if cache_name else None
+        self.keyword_index_backend = keyword_index
+        self._keyword_emb = None
+        self._keyword_index = None
+        self.stop_early = stop_early
+        self._keys_needed = None
+
+    @property
+    def keyword_index(self):
+        # 키워드 top-k 검색 색인. ivf 는 템플릿 캐시 옆에 저장해 두고 다시 씀 (캐시 이름이 없는 인코더는 매번 만듦)
+        if self._keyword_index is None:
+            path = None
+            if self.cache_name:
+                path = index_path_for(self.template_hash, self.cache_name, self.template_cache_dir)
+            with metrics.timer('keyword_index'):
+                self._keyword_index = build_keyword_index(self.keyword_emb, self.keyword_index_backend, path)
+        return self._keyword_index
+
+    @property
+    def keyword_emb(self):
+        if self._keyword_emb is None:
+            keyword_emb = self._template_data['keyword_emb']
+            self._keyword_emb = keyword_emb.get(self.cache_name) if self.cache_name else None
+            if self._keyword_emb is None:
+                with metrics.timer('keyword_encode'):
+                    self._keyword_emb = self._encode(self.keywords)
+                if self.cache_name:
+                    keyword_emb[self.cache_name] = self._keyword_emb
+                    save_cached_template(self.template_hash, self._template_data, self.template_cache_dir)
+        return self._keyword_emb
+
+    def _encode(self, texts, batch_size=ENCODE_BATCH_SIZE):
+        cache = self.embedding_cache
+        if cache is None:
+            with metrics.timer('encode'):
+                emb = np.asarray(self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True),
+                                 dtype=np.float32)
+            metrics.count('fragments_encoded', len(texts))
+            return emb
+        # 임베딩 캐시 적중/누락 수를 metrics 에 더함
+        hits, misses = cache.hits, cache.misses
+        with metrics.timer('encode'):
+            emb = cache.encode(self.model, texts, batch_size=batch_size)
+        metrics.count('embedding_cache_hits', cache.hits - hits)
+        metrics.count('embedding_cache_misses', cache.misses - misses)
+        metrics.count('fragments_encoded', cache.misses - misses)
+        return emb
+
+    def prepass_keyword(self, word):
+        # 모델 없이 정해지는 (키워드, 'exact' | 'normalized'), 없으면 (None, None)
+        keyword = self.exact_keywords.get(normalize_text(word))
+        if keyword is not None:
+            return keyword, 'exact'
+        key = normalize_key(word)
+        keyword = self.normalized_keywords.get(key) if key else None
+        return (keyword, 'normalized') if keyword is not None else (None, None)
+
+    def prepass_line(self, line):
+        return ' '.join(self.prepass_keyword(word)[0] or word for word in split_meaningful(line))
+
+    def key_tracker(self):
+        # stop_early 일 때 추출 함수에 넘길 KeyTracker (입력마다 새로 만듦), 아니면 None
+        # 모델 없는 매핑만 보고 세는 근사라서 끝까지 읽은 결과와 다를 수 있음 (KeyTracker 참고)
+        if not self.stop_early:
+            return None
+        if self._keys_needed is None:
+            self._keys_needed = template_key_counts(self.template_styles)
+        needed, cell_keys = self._keys_needed
+        return KeyTracker(needed, cell_keys, self.prepass_line)
+
+    def close(self):
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+
+    def map_corpus(self, texts_list, threshold=None):
+        with metrics.timer('map'):
+            return self._map_corpus(texts_list, self.threshold if threshold is None else threshold)
+
+    def _map_corpus(self, texts_list, threshold):
+        # 여러 파일의 줄 목록을 한꺼번에 매핑: 전체 조각을 모아 중복 없이 큰 배치로 인코딩
+        split_list = [[split_meaningful(text) for text in texts] for texts in texts_list]
+        fragments = list(dict.fromkeys(
+            word for split_texts in split_list for words in split_texts for word in words
+        ))
+        mapped = {}
+        tracing = trace_enabled()
+        # 키워드와 그대로 같거나 정규화한 키가 같은 조각은 인코딩하지 않음
+        remaining = []
+        exact = normalized = 0
+        for word in fragments:
+            keyword, match_type = self.prepass_keyword(word)
+            if keyword is None:
+                remaining.append(word)
+                continue
+            if match_type == 'exact':
+                exact += 1
+            else:
+                normalized += 1
+            mapped[word] = keyword
+            if tracing:
+                trace('map', fragment=word, keyword=keyword, score=1.0, accepted=True, match=match_type)
+        metrics.count('fragments_exact', exact)
+        metrics.count('fragments_normalized', normalized)
+
+        if remaining:
+            fragment_emb = self._encode(remaining, batch_size=ENCODE_BATCH_SIZE)
+            # 추적 중이면 후보 3개까지 기록
+            with metrics.timer('keyword_search'):
+                scores, ids = self.keyword_index.search(fragment_emb, k=3 if tracing else 1)
+            for word, word_scores, word_ids in zip(remaining, scores.tolist(), ids.tolist()):
+                best_idx, max_score = word_ids[0], word_scores[0]
+                mapped[word] = self.keywords[best_idx] if max_score >= threshold else word
+                if tracing:
+                    trace('map', fragment=word, keyword=self.keywords[best_idx],
+                          score=round(max_score, 4), accepted=max_score >= threshold,
+                          candidates=[[self.keywords[i], round(score, 4)]
+                                      for i, score in zip(word_ids, word_scores) if i >= 0])
+
+        metrics.count('lines_mapped', sum(len(split_texts) for split_texts in split_list))
+        metrics.count('fragments', len(fragments))
+        return [
+            [' '.join(mapped[word] for word in words) for words in split_texts]
+            for split_texts in split_list
+        ]
+
+    def map_texts(self, texts, threshold=None):
+        return self.map_corpus([texts], threshold)[0]
+
+    def map_batch(self, texts_list):
+        # [(채울 TemplateFiller, 매핑된 줄 목록), ...], 템플릿 폴더(TemplateRegistry)와 같은 형태
+        return [(self, updated) for updated in self.map_corpus(texts_list)]
+
+    def fill(self, doc, lines, first_section=True):
+        fill_document(doc, self.template_styles, lines, first_section, self.clone_tables, self.match_window)
+
+    def convert(self, lines):
+        # 입력 줄 목록 하나로 새 DOCX 문서를 만들어 반환
+        return self.convert_mapped(self.map_texts(lines))
+
+    def convert_mapped(self, lines):
+        doc = Document()
+        self.fill(doc, lines)
+        return doc
+
+def make_filler(template_path, **filler_options):
+    # 템플릿 파일이면 TemplateFiller, 폴더면 입력마다 템플릿을 고르는 TemplateRegistry
+    if os.path.isdir(template_path):
+        from template_registry import TemplateRegistry
+        return TemplateRegistry(template_path, **filler_options)
+    return TemplateFiller(template_path, **filler_options)
+
+def output_path_for(output_dir, path):
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + '.docx')
+
+def extract_timed(extract, path, filler=None):
+    # filler 가 stop_early 이면 extract(path, done=KeyTracker) 로 필요한 줄이 다 나왔을 때 그만 읽게 함
+    tracker = filler.key_tracker() if filler is not None else None
+    with metrics.document([path]):
+        with metrics.timer('extract'):
+            lines = extract(path, done=tracker) if tracker is not None else extract(path)
+        metrics.count('files')
+    return lines
+
+def iter_extracted(extract, paths, filler=None):
+    # 파일을 하나씩 읽어서 바로 넘김 (전체 결과 리스트를 메모리에 만들지 않음)
+    for path in paths:
+        yield path, extract_timed(extract, path, filler)
+
+def iter_mapped(filler, extracted, chunk_size=MAP_CHUNK_FILES):
+    # chunk_size 개 파일씩 모아 한 번에 매핑 -> 배치 효율은 살리고 메모리는 chunk 크기로 제한
+    extracted = iter(extracted)
+    while True:
+        chunk = list(islice(extracted, chunk_size))
+        if not chunk:
+            return
+        # 묶어서 매핑한 시간/조각 수는 파일마다 줄 수 비율로 나눠서 기록
+        with metrics.document([path for path, _ in chunk], [len(lines) + 1 for _, lines in chunk]):
+            mapped = filler.map_batch([lines for _, lines in chunk])
+        for (path, lines), (target, updated) in zip(chunk, mapped):
+            yield path, lines, updated, target
+
+def save_document(doc, out_path):
+    # doc.save 시간과 쓴 바이트 수를 기록 (out_path 는 경로 또는 file-like)
+    with metrics.timer('save'):
+        doc.save(out_path)
+    if isinstance(out_path, str):
+        size = os.path.getsize(out_path)
+    else:
+        size = out_path.tell()
+    metrics.count('documents')
+    metrics.count('bytes_written', size)
+
+def write_document(filler, lines, out_path):
+    doc = Document()
+    filler.fill(doc, lines)
+    save_document(doc, out_path)
+
+def convert_files(doc, extract, paths, template_path, output_dir=None, chunk_size=MAP_CHUNK_FILES,
+                  filler_options=None):
+    # filler_options: TemplateFiller 에 넘길 옵션 (clone_tables, encoder, ...), filler_options_from(args) 참고
+    filler = make_filler(template_path, **(filler_options or {}))
+    run_pipeline(filler, doc, extract, paths, output_dir, chunk_size)
+
+def run_pipeline(filler, doc, extract, paths, output_dir=None, chunk_size=MAP_CHUNK_FILES):
+    # 추출 -> 매핑 -> 채우기 -> 쓰기를 파일 단위로 흘려보냄
+    # output_dir 를 주면 파일마다 바로 저장하고 버리므로 메모리가 폴더 크기와 무관함
+    mapped = iter_mapped(filler, iter_extracted(extract, paths, filler), chunk_size)
+    for idx, (path, original_lines, lines, target) in enumerate(mapped):
+        logger.info("📄 OCR 페이지 %d 시작: %s", idx + 1, path)
+        if logger.isEnabledFor(logging.DEBUG):
+            for original, updated in zip(original_lines, lines):
+                logger.debug("원문: %s / 수정: %s", original, updated)
+        trace('file', path=path, lines=len(lines))
+        with metrics.document([path]):
+            if output_dir:
+                write_document(target, lines, output_path_for(output_dir, path))
+            else:
+                target.fill(doc, lines, first_section=(idx == 0))
+
+def convert_file(filler, extract, path, out_path=None):
+    # 입력 파일 하나를 새 문서로 채움. out_path 가 있으면 바로 저장, 없으면 본문(w:body) XML 반환
+    lines = extract_timed(extract, path, filler)
+    with metrics.document([path]):
+        target, lines = filler.map_batch([lines])[0]
+        trace('file', path=path, lines=len(lines))
+        if out_path:
+            write_document(target, lines, out_path)
+            return None
+        return etree.tostring(target.convert_mapped(lines).element.body)
+
+def append_body(doc, body_xml, first_part=False):
+    # 따로 만든 문서 본문을 doc 뒤에 이어 붙임. 섹션 경계는 doc.add_section(0) 을 쓴 것과 같은 구조로 맞춤
+    body = doc.element.body
+    sentinel = body.get_or_add_sectPr()
+    part = parse_xml(body_xml)
+    part_sectPr = part.find(qn('w:sectPr'))
+
+    if not first_part:
+        # 앞 문서의 마지막 섹션은 문단 수준 sectPr 로 닫고, 붙일 문서의 첫 섹션은 연속 구역으로 시작
+        body.add_p().set_sectPr(sentinel.clone())
+        first_sectPr = part.xpath('./w:p/w:pPr/w:sectPr')
+        (first_sectPr[0] if first_sectPr else part_sectPr).start_type = WD_SECTION.CONTINUOUS
+
+    for child in list(part):
+        if child is not part_sectPr:
+            sentinel.addprevious(child)
+    body.replace(sentinel, part_sectPr)
+
+# --- 여러 프로세스로 나눠 변환 (--workers N) ---
+_worker_filler = None
+
+def _init_worker(template_path, filler_options=None, log_level=None, trace_path=None):
+    # 워커 프로세스마다 모델과 템플릿을 한 번씩만 로드 (로그/추적 설정도 워커에서 다시 적용)
+    global _worker_filler
+    if log_level or trace_path:
+        setup_logging(log_level or 'WARNING', trace_path)
+    _worker_filler = make_filler(template_path, **(filler_options or {}))
+
+def _convert_in_worker(task):
+    # 결과와 함께 이 작업 동안 쌓인 metrics 를 돌려보내 부모에서 합침
+    extract, path, out_path = task
+    body_xml = convert_file(_worker_filler, extract, path, out_path)
+    return body_xml, metrics.snapshot(reset=True)
+
+def _imap_bounded(executor, fn, tasks, window):
+    # executor.map 과 달리 한 번에 window 개까지만 작업을 걸어 둠 (입력 순서대로 결과 반환)
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(fn, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def convert_files_parallel(doc, extract, paths, template_path, workers, output_dir=None, filler_options=None,
+                           log_level=None, trace_path=None):
+    # 결과는 입력 순서대로 받아서 붙이므로 출력 순서는 항상 같음
+    tasks = ((extract, path, output_path_for(output_dir, path) if output_dir else None) for path in paths)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(template_path, filler_options, log_level, trace_path)) as executor:
+        for idx, (body_xml, worker_metrics) in enumerate(_imap_bounded(executor, _convert_in_worker, tasks, workers * 2)):
+            metrics.merge(worker_metrics)
+            logger.info("📄 OCR 페이지 %d 완료", idx + 1)
+            if body_xml is not None:
+                append_body(doc, body_xml, first_part=(idx == 0))
+
+def setup_logging(level='WARNING', trace_path=None):
+    # 기본(WARNING)에서는 진행/매칭 로그를 찍지 않음. trace_path 를 주면 매칭 결정을 JSONL 로 기록
+    logging.basicConfig(
+        level=getattr(logging, level.upper()),
+        format='%(asctime)s %(levelname)s %(processName)s %(name)s: %(message)s',
+    )
+    if trace_path:
+        open_trace(trace_path)
+
+def write_metrics(json_path=None, prom_path=None):
+    if json_path:
+        metrics.write_json(json_path)
+    if prom_path:
+        metrics.write_prometheus(prom_path)
+
+# --stop-early 도움말 (스크립트마다 같이 씀)
+STOP_EARLY_HELP = ("템플릿 키가 모두 나오면 남은 입력은 읽지 않음. 정확/정규화 일치만 보고 세는 근사라서 "
+                   "임베딩 매핑이 줄을 바꾸는 입력은 끝까지 읽은 결과와 다를 수 있음")
+
+def add_filler_arguments(parser):
+    # TemplateFiller 옵션 (스크립트와 서버가 같이 씀)
+    parser.add_argument('--clone-tables', action='store_true', help="템플릿 표를 그대로 복제하고 값만 써 넣음 (빠름). 그림/하이퍼링크가 있는 표는 "
+                             "복제하지 않고 새로 만듦 (표마다 쓴 경로는 --trace 의 'table' 기록)")
+    parser.add_argument('--encoder', default='sbert', choices=ENCODER_BACKENDS,
+                        help="키워드 매핑 인코더 (tfidf: 모델 없이 바로 시작)")
+    parser.add_argument('--onnx-path', default=None, help="ONNX 로 내보낸 모델 폴더 (--encoder onnx)")
+    parser.add_argument('--threshold', type=float, default=None, help="매핑 유사도 기준값 (기본: 인코더별)")
+    parser.add_argument('--keyword-index', default='auto', choices=KEYWORD_INDEX_BACKENDS,
+                        help="키워드 검색 방식 (auto: 키워드가 많으면 ivf)")
+    parser.add_argument('--match-window', type=int, default=None,
+                        help="마지막으로 찾은 입력 줄부터 이 줄 수 안에서 먼저 찾음 (입력이 문서 순서일 때, 기본: 항상 맨 앞부터)")
+
+def filler_options_from(args):
+    return {
+        'clone_tables': args.clone_tables,
+        'encoder': args.encoder,
+        'onnx_path': args.onnx_path,
+        'threshold': args.threshold,
+        'keyword_index': args.keyword_index,
+        'match_window': args.match_window,
+    }
+
+def make_arg_parser(description, input_dir, output_path):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--input', default=input_dir, help="입력 파일 폴더")
+    parser.add_argument('--template', default=TEMPLATE_PATH, help="템플릿 DOCX 경로 (폴더를 주면 입력마다 가장 잘 맞는 템플릿을 고름)")
+    parser.add_argument('--output', default=output_path, help="결과 DOCX 경로")
+    parser.add_argument('--workers', type=int, default=1, help="변환에 쓸 프로세스 수")
+    parser.add_argument('--output-dir', default=None, help="입력 파일마다 DOCX 를 따로 저장할 폴더 (지정 시 --output 무시)")
+    parser.add_argument('--map-chunk', type=int, default=MAP_CHUNK_FILES, help="한 번에 묶어서 매핑할 파일 수")
+    add_filler_arguments(parser)
+    parser.add_argument('--log-level', default='WARNING', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="로그 수준 (DEBUG: 셀마다 매칭 과정 출력)")
+    parser.add_argument('--trace', default=None, help="매칭 결정을 기록할 JSONL 파일 경로")
+    parser.add_argument('--metrics', default=None, help="단계별 시간/카운터를 저장할 JSON 파일 경로")
+    parser.add_argument('--metrics-prom', default=None, help="같은 내용을 Prometheus 텍스트 형식으로 저장할 파일 경로")
+    return parser
+
+def run_cli(args, extract, list_files, filler_options):
+    # 변환 스크립트(docx_to_docx / pdf_to_docs / ocr_to_docs)의 공통 실행 순서
+    # list_files(입력 폴더) -> 파일 이름 목록, extract(path, done=None) -> 줄 목록
+    setup_logging(args.log_level, args.trace)
+    paths = [os.path.join(args.input, f) for f in list_files(args.input)]
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    doc = Document()
+
+    if args.workers > 1:
+        # 추출, 매핑, 문서 생성을 프로세스 풀에 나눠서 실행 (워커마다 모델/템플릿 따로 로드)
+        convert_files_parallel(doc, extract, paths, args.template, args.workers, args.output_dir,
+                               filler_options, args.log_level, args.trace)
+    else:
+        convert_files(doc, extract, paths, args.template, args.output_dir, args.map_chunk, filler_options)
+
+    if not args.output_dir:
+        save_document(doc, args.output)
+    write_metrics(args.metrics, args.metrics_prom)
@@ -0,0 +1,144 @@
+from enum import IntEnum
+
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+# 파싱된 템플릿의 문단/표/셀/run 구조
+# 셀마다 dict 여러 개를 만들던 것을 __slots__ 객체로 바꾸고, 테두리와 글자 서식은
+# 같은 값이면 같은 객체를 공유(intern)한다. 템플릿 여러 개를 메모리에 올려 둘 때 크기가 작고 순회도 빠름
+
+
+class VMerge(IntEnum):
+    NONE = 0
+    RESTART = 1
+    CONTINUE = 2
+
+
+class Align(IntEnum):
+    # WD_PARAGRAPH_ALIGNMENT 값과 같음, 정렬 지정이 없으면 NONE
+    NONE = -1
+    LEFT = 0
+    CENTER = 1
+    RIGHT = 2
+    JUSTIFY = 3
+    DISTRIBUTE = 4
+    JUSTIFY_MED = 5
+    JUSTIFY_HI = 7
+    JUSTIFY_LOW = 8
+    THAI_JUSTIFY = 9
+
+
+BORDER_SIDES = ('top', 'bottom', 'left', 'right', 'insideH', 'insideV')
+CELL_BORDER_SIDES = ('top', 'bottom', 'left', 'right')
+
+
+class Border:
+    # 한 변의 테두리 (w:val, w:sz, w:color, w:space)
+    __slots__ = ('val', 'sz', 'color', 'space')
+
+    def __init__(self, val, sz, color, space):
+        self.val = val
+        self.sz = sz
+        self.color = color
+        self.space = space
+
+
+class RunStyle:
+    __slots__ = ('font_name', 'font_size', 'bold', 'italic', 'underline', 'color')
+
+    def __init__(self, font_name, font_size, bold, italic, underline, color):
+        self.font_name = font_name
+        self.font_size = font_size
+        self.bold = bold
+        self.italic = italic
+        self.underline = underline
+        self.color = color
+
+
+class Run:
+    __slots__ = ('text', 'style')
+
+    def __init__(self, text, style):
+        self.text = text
+        self.style = style
+
+
+class Paragraph:
+    source = 'text'
+    __slots__ = ('text', 'alignment', 'runs')
+
+    def __init__(self, text, alignment, runs):
+        self.text = text
+        self.alignment = alignment
+        self.runs = runs
+
+
+class Cell:
+    __slots__ = ('row', 'col', 'grid_span', 'vmerge', 'borders', 'width', 'height', 'paragraphs')
+
+    def __init__(self, row, col, grid_span, vmerge, borders, width, height, paragraphs):
+        self.row = row
+        self.col = col
+        self.grid_span = grid_span
+        self.vmerge = vmerge
+        # ((side, Border), ...) 또는 None
+        self.borders = borders
+        # twips, 지정이 없으면 None
+        self.width = width
+        self.height = height
+        self.paragraphs = paragraphs
+
+
+class Table:
+    source = 'table'
+    __slots__ = ('table_index', 'borders', 'cells', 'xml')
+
+    def __init__(self, table_index, borders, cells, xml):
+        self.table_index = table_index
+        self.borders = borders
+        self.cells = cells
+        # 표 복제(--clone-tables)용 원본 w:tbl
+        self.xml = xml
+
+
+# --- 공유 객체 ---
+_borders = {}
+_border_sets = {}
+_run_styles = {}
+
+
+def intern_border(val, sz, color, space):
+    key = (val, sz, color, space)
+    border = _borders.get(key)
+    if border is None:
+        border = _borders[key] = Border(val, sz, color, space)
+    return border
+
+
+def intern_border_set(pairs):
+    # [(side, Border), ...] -> 공유 tuple, 비어 있으면 None
+    if not pairs:
+        return None
+    key = tuple((side, id(border)) for side, border in pairs)
+    border_set = _border_sets.get(key)
+    if border_set is None:
+        border_set = _border_sets[key] = tuple(pairs)
+    return border_set
+
+
+def intern_run_style(font_name, font_size, bold, italic, underline, color):
+    key = (font_name, font_size, bold, italic, underline, color)
+    style = _run_styles.get(key)
+    if style is None:
+        style = _run_styles[key] = RunStyle(font_name, font_size, bold, italic, underline, color)
+    return style
+
+
+def to_align(alignment):
+    return Align.NONE if alignment is None else Align(int(alignment))
+
+
+def from_align(align):
+    # python-docx 의 paragraph.alignment 에 넣을 값
+    if align == Align.NONE:
+        return None
+    return WD_PARAGRAPH_ALIGNMENT(int(align))
@@ -0,0 +1,130 @@
+import os
+import re
+
+import numpy as np
+
+import metrics
+from match_trace import trace, trace_enabled
+from template_filler import TemplateFiller, logger, normalize_key
+
+# 템플릿 폴더를 한 번에 올려 두고, 입력마다 가장 잘 맞는 템플릿을 골라 채움 (--template 에 폴더를 주면 사용)
+# 1) 항목명 비교: 입력 줄의 "항목 : 값" 조각 키와 템플릿 키워드 키의 겹침을 (입력 x 템플릿) 행렬곱 한 번으로 계산
+# 2) 항목명이 거의 안 겹치면 임베딩 비교: 입력 조각마다 템플릿별 최고 유사도의 평균 (모든 템플릿 키워드를 한 행렬로)
+
+# 항목명 점수가 이보다 낮으면 임베딩으로 다시 고름
+ROUTE_MIN_LABEL_SCORE = 0.2
+
+
+def list_template_files(template_dir):
+    # Word 임시 파일(~$...)은 제외
+    return sorted(
+        os.path.join(template_dir, f) for f in os.listdir(template_dir)
+        if f.endswith('.docx') and not f.startswith('~$')
+    )
+
+
+def line_label_keys(lines):
+    keys = set()
+    for line in lines:
+        for part in re.split(r'\s*[:：]\s*', line):
+            key = normalize_key(part)
+            if key:
+                keys.add(key)
+    return keys
+
+
+class TemplateRegistry:
+    def __init__(self, template_dir, route_threshold=ROUTE_MIN_LABEL_SCORE, **filler_options):
+        paths = list_template_files(template_dir)
+        if not paths:
+            raise ValueError(f"템플릿이 없습니다: {template_dir}")
+        self.template_dir = template_dir
+        self.route_threshold = route_threshold
+        first = TemplateFiller(paths[0], **filler_options)
+        # 인코더는 템플릿끼리 같이 씀. 템플릿 키워드로 학습하는 인코더(tfidf)는 템플릿마다 따로
+        self.shared_model = not hasattr(first.model, 'fit')
+        options = dict(filler_options, model=first.model) if self.shared_model else filler_options
+        self.fillers = [first] + [TemplateFiller(path, **options) for path in paths[1:]]
+        self.names = [os.path.basename(path) for path in paths]
+
+        # 항목명 행렬: (템플릿 수, 전체 키 수) 0/1, 행마다 길이 1 로 정규화
+        template_keys = [{normalize_key(k) for k in filler.keywords} - {''} for filler in self.fillers]
+        self.vocab = {key: i for i, key in enumerate(sorted(set().union(*template_keys)))}
+        self.label_matrix = np.zeros((len(self.fillers), len(self.vocab)), dtype=np.float32)
+        for row, keys in enumerate(template_keys):
+            self.label_matrix[row, [self.vocab[key] for key in keys]] = 1.0
+        self.label_matrix /= np.clip(np.linalg.norm(self.label_matrix, axis=1, keepdims=True), 1e-12, None)
+        self._keyword_matrix = None
+
+    def _keyword_segments(self):
+        # 모든 템플릿의 정규화된 키워드 임베딩을 이어 붙인 행렬과 템플릿별 시작 위치
+        if self._keyword_matrix is None:
+            embs = [filler.keyword_index.emb for filler in self.fillers]
+            self._keyword_matrix = np.concatenate(embs)
+            self._keyword_offsets = np.cumsum([0] + [len(emb) for emb in embs[:-1]])
+        return self._keyword_matrix, self._keyword_offsets
+
+    def label_scores(self, texts_list):
+        # (입력 수, 템플릿 수) 코사인 점수
+        inputs = np.zeros((len(texts_list), len(self.vocab)), dtype=np.float32)
+        sizes = np.ones(len(texts_list), dtype=np.float32)
+        for row, texts in enumerate(texts_list):
+            keys = line_label_keys(texts)
+            sizes[row] = max(len(keys), 1)
+            cols = [self.vocab[key] for key in keys if key in self.vocab]
+            inputs[row, cols] = 1.0
+        return (inputs @ self.label_matrix.T) / np.sqrt(sizes)[:, None]
+
+    def embedding_scores(self, texts):
+        # 템플릿마다 "입력 조각별 최고 유사도" 의 평균
+        fragments = sorted(line_label_keys(texts))
+        if not fragments:
+            return np.zeros(len(self.fillers), dtype=np.float32)
+        matrix, offsets = self._keyword_segments()
+        emb = self.fillers[0]._encode(fragments)
+        emb = emb / np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+        best = np.maximum.reduceat(emb @ matrix.T, offsets, axis=1)
+        return best.mean(axis=0)
+
+    def route(self, texts_list):
+        # 입력마다 템플릿 번호
+        with metrics.timer('route'):
+            scores = self.label_scores(texts_list)
+            choices = scores.argmax(axis=1).tolist()
+            tracing = trace_enabled()
+            for row, texts in enumerate(texts_list):
+                method = 'labels'
+                best = float(scores[row, choices[row]])
+                if best < self.route_threshold and self.shared_model and len(self.fillers) > 1:
+                    emb_scores = self.embedding_scores(texts)
+                    choices[row] = int(emb_scores.argmax())
+                    best = float(emb_scores[choices[row]])
+                    method = 'embeddings'
+                metrics.count(f'routed_{method}')
+                logger.debug("route: %s (%s %.3f)", self.names[choices[row]], method, best)
+                if tracing:
+                    trace('route', template=self.names[choices[row]], method=method, score=round(best, 4))
+        return choices
+
+    def map_batch(self, texts_list):
+        # [(고른 템플릿의 TemplateFiller, 매핑된 줄 목록), ...] (입력 순서대로)
+        choices = self.route(texts_list)
+        results = [None] * len(texts_list)
+        for template_no in sorted(set(choices)):
+            rows = [row for row, choice in enumerate(choices) if choice == template_no]
+            filler = self.fillers[template_no]
+            for row, updated in zip(rows, filler.map_corpus([texts_list[row] for row in rows])):
+                results[row] = (filler, updated)
+        return results
+
+    def key_tracker(self):
+        # 어느 템플릿을 채울지는 입력을 다 읽어야 정해지므로 일찍 멈추지 않음
+        return None
+
+    def convert(self, lines):
+        filler, updated = self.map_batch([lines])[0]
+        return filler.convert_mapped(updated)
+
+    def close(self):
+        for filler in self.fillers:
+            filler.close()
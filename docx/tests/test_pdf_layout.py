@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from pdf_layout import extract_lines, join_label_values
+
+
+def cells(*texts):
+    return [{'text': text, 'bbox': (i * 100, 0, i * 100 + 50, 10)} for i, text in enumerate(texts)]
+
+
+def texts(out):
+    return [cell['text'] for cell in out]
+
+
+def test_join_label_value():
+    assert texts(join_label_values(cells('성명 :', '홍길동'))) == ['성명 : 홍길동']
+    assert texts(join_label_values(cells('연락처', ': 010-1234'))) == ['연락처 : 010-1234']
+    assert texts(join_label_values(cells('시간 :', '10:30'))) == ['시간 : 10:30']
+
+
+def test_value_with_colon_is_joined():
+    assert texts(join_label_values(cells('접수시간 :', '오전 10:30'))) == ['접수시간 : 오전 10:30']
+    assert texts(join_label_values(cells('홈페이지 :', 'www.a.com:8080'))) == ['홈페이지 : www.a.com:8080']
+    assert texts(join_label_values(cells('주소 :', 'http://a.com'))) == ['주소 : http://a.com']
+
+
+def test_blank_value_is_not_joined_with_next_label():
+    assert texts(join_label_values(cells('나이 :', '주소 :', '서울'))) == ['나이 :', '주소 : 서울']
+    assert texts(join_label_values(cells('나이 :', '주소 : 서울'))) == ['나이 :', '주소 : 서울']
+
+
+def test_layout_lines_with_blank_field(tmp_path):
+    path = str(tmp_path / 'blank.pdf')
+    doc = fitz.open()
+    page = doc.new_page()
+    writer = fitz.TextWriter(page.rect)
+    font = fitz.Font('cjk')
+    for x, text in ((50, '나이 :'), (200, '주소 :'), (350, '서울')):
+        writer.append((x, 100), text, font=font, fontsize=11)
+    writer.write_text(page)
+    doc.save(path)
+    doc.close()
+    assert extract_lines(path, 'layout') == ['나이 :', '주소 : 서울']
@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from docx import Document
+
+from synthetic import make_template
+from template_filler import fill_document, load_template
+from template_model import VMerge
+
+
+def table_texts(doc):
+    return [[[cell.text for cell in row.cells] for row in table.rows] for table in doc.tables]
+
+
+def tc_texts(doc):
+    return [[[tc.xpath('string(.)') for tc in tr.tc_lst] for tr in table._tbl.tr_lst] for table in doc.tables]
+
+
+def fill(template_styles, lines, clone_tables):
+    doc = Document()
+    fill_document(doc, template_styles, lines, clone_tables=clone_tables)
+    return doc
+
+
+def test_vmerge_continue_cell(tmp_path):
+    # 합성 템플릿은 세 번째 행마다 첫 칸이 위 행과 세로 병합됨
+    path = str(tmp_path / 'template.docx')
+    make_template(path, paragraphs=0, rows=3, cols=4)
+    template_styles, _, _ = load_template(path)
+    cells = [item for item in template_styles[0]['content'] if item.source == 'table'][0].cells
+    vmerge = {(cell.row, cell.col): cell.vmerge for cell in cells}
+    assert vmerge[(1, 0)] == VMerge.RESTART
+    assert vmerge[(2, 0)] == VMerge.CONTINUE
+
+
+def test_clone_tables_matches_build_on_vmerge(tmp_path):
+    path = str(tmp_path / 'template.docx')
+    make_template(path, paragraphs=0, rows=6, cols=4)
+    template_styles, _, _ = load_template(path)
+    lines = ['이메일표4 hong@x.com', '성명표12 홍길동']
+    built = fill(template_styles, lines, clone_tables=False)
+    cloned = fill(template_styles, lines, clone_tables=True)
+    assert table_texts(built)[0][1][0] == '이메일표4 hong@x.com'
+    assert table_texts(cloned) == table_texts(built)
+    assert tc_texts(cloned) == tc_texts(built)